@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+"""Benchmarks of the cocotb-test runner overhead.
+
+A stub simulator (see `stub_sim.py`) replaces `iverilog` and `vvp` so only the
+time spent in cocotb-test itself is measured. Results are saved as JSON and can
+be compared against an earlier run to catch regressions in the hot paths:
+
+    python benchmarks/run_benchmarks.py --save baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json
+
+Use `--scale 0.1` for a quick run with smaller scenarios.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import cocotb_test
+from cocotb_test.simulator import Icarus
+
+STUB_SIM = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_sim.py")
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__.replace("bench_", "")] = func
+    return func
+
+
+def best_of(func, repeat=3):
+    """Return shortest wall time of `repeat` calls of `func`"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def make_stub_bin(bin_dir):
+    for name in ("iverilog", "vvp"):
+        path = os.path.join(bin_dir, name)
+        with open(path, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" -S "{STUB_SIM}" "$@"\n')
+        os.chmod(path, 0o755)
+
+
+def make_sources(src_dir, count):
+    os.makedirs(src_dir, exist_ok=True)
+    sources = []
+    for i in range(count):
+        path = os.path.join(src_dir, f"mod_{i}.v")
+        with open(path, "w") as f:
+            f.write(f"module mod_{i}(input wire a, output wire b);\n    assign b = a;\nendmodule\n")
+        sources.append(path)
+    return sources
+
+
+def simulator(ctx, **kwargs):
+    kwargs.setdefault("verilog_sources", ctx["sources"][:1])
+    kwargs.setdefault("sim_build", os.path.join(ctx["work_dir"], "sim_build"))
+    return Icarus(toplevel="mod_0", module="stub", **kwargs)
+
+
+@benchmark
+def bench_init_10k_sources(ctx):
+    return best_of(lambda: simulator(ctx, verilog_sources=ctx["sources"]))
+
+
+@benchmark
+def bench_set_env_x100(ctx):
+    sim = simulator(ctx)
+
+    def set_env():
+        for _ in range(100):
+            sim.env = {}
+            sim.set_env()
+
+    return best_of(set_env)
+
+
+@benchmark
+def bench_outdated_10k_sources(ctx):
+    sim = simulator(ctx, verilog_sources=ctx["sources"])
+    output = os.path.join(sim.sim_dir, "outdated.out")
+    with open(output, "w") as f:
+        f.write("stub")
+    commands = [["iverilog", "-o", output] + ctx["sources"]]
+
+    sim.outdated(output, ctx["sources"], commands)
+    sim.save_fingerprints()
+
+    return best_of(lambda: sim.outdated(output, ctx["sources"], commands))
+
+
+@benchmark
+def bench_results_100k_testcases(ctx):
+    count = ctx["scaled"](100000)
+    results_xml_file = os.path.join(ctx["work_dir"], "results_100k.xml")
+    with open(results_xml_file, "w") as f:
+        f.write('<testsuites name="results"><testsuite name="all" package="all">\n')
+        for i in range(count):
+            f.write(f'<testcase name="test_{i}" classname="stub" time="0.001" sim_time_ns="10" ratio_time="1" />\n')
+        f.write("</testsuite></testsuites>\n")
+
+    # parse results only, skip compilation and simulation
+    class ResultsOnly(Icarus):
+        def _run(self):
+            return results_xml_file
+
+    sim = ResultsOnly(toplevel="mod_0", module="stub", sim_build=os.path.join(ctx["work_dir"], "sim_build"))
+    return best_of(sim.run)
+
+
+@benchmark
+def bench_runs_1k_parameters(ctx):
+    sim_build = os.path.join(ctx["work_dir"], "sim_build_parameters")
+
+    def runs():
+        for i in range(ctx["scaled"](1000)):
+            simulator(ctx, parameters={"WIDTH": i}, sim_build=sim_build).run()
+
+    return best_of(runs, repeat=1)
+
+
+@benchmark
+def bench_log_100mb(ctx):
+    os.environ["STUB_LOG_BYTES"] = str(ctx["scaled"](100 * 1024 * 1024))
+    try:
+        return best_of(simulator(ctx).run, repeat=1)
+    finally:
+        del os.environ["STUB_LOG_BYTES"]
+
+
+@benchmark
+def bench_log_100mb_log_file(ctx):
+    os.environ["STUB_LOG_BYTES"] = str(ctx["scaled"](100 * 1024 * 1024))
+    try:
+        sim = simulator(ctx, log_file=os.path.join(ctx["work_dir"], "sim.log"))
+        return best_of(sim.run, repeat=1)
+    finally:
+        del os.environ["STUB_LOG_BYTES"]
+
+
+def compare(results, baseline, threshold):
+    """Print ratio to baseline, return names of benchmarks slower than `threshold`"""
+    slower = []
+    for name, value in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            print(f"{name:30} {value:10.4f}s  (new)")
+            continue
+        ratio = value / base
+        print(f"{name:30} {value:10.4f}s  {base:10.4f}s  x{ratio:.2f}")
+        if ratio > threshold:
+            slower.append(name)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="cocotb-test runner benchmarks")
+    parser.add_argument("-k", dest="select", help="run only benchmarks containing this string")
+    parser.add_argument("--scale", type=float, default=1.0, help="scale size of scenarios (default: 1.0)")
+    parser.add_argument("--save", metavar="path", help="save results as JSON")
+    parser.add_argument("--compare", metavar="path", help="compare with results saved earlier")
+    parser.add_argument("--threshold", type=float, default=1.2, help="fail if slower than baseline by this factor")
+    args = parser.parse_args()
+
+    # measure runner overhead, not terminal output
+    logger = logging.getLogger("cocotb")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    work_dir = tempfile.mkdtemp(prefix="cocotb_test_bench_")
+    bin_dir = os.path.join(work_dir, "bin")
+    os.makedirs(bin_dir)
+    make_stub_bin(bin_dir)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+
+    def scaled(count):
+        return max(1, int(count * args.scale))
+
+    ctx = {
+        "work_dir": work_dir,
+        "scaled": scaled,
+        "sources": make_sources(os.path.join(work_dir, "src"), scaled(10000)),
+    }
+
+    results = {
+        "cocotb_test": cocotb_test.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "benchmarks": {},
+    }
+
+    try:
+        for name, func in BENCHMARKS.items():
+            if args.select and args.select not in name:
+                continue
+            results["benchmarks"][name] = func(ctx)
+            if not args.compare:
+                print(f"{name:30} {results['benchmarks'][name]:10.4f}s")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            slower = compare(results, json.load(f), args.threshold)
+        if slower:
+            print("Slower than baseline: " + ", ".join(slower))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Stub simulator used by the benchmarks to measure cocotb-test overhead only.
+
+Called with ``-o <output>`` it acts as compiler and writes the output file.
+Otherwise it acts as simulator: writes ``STUB_LOG_BYTES`` bytes of output and
+a results file with ``STUB_TESTCASES`` passing testcases to ``COCOTB_RESULTS_FILE``.
+"""
+
+import os
+import sys
+
+
+def main():
+    args = sys.argv[1:]
+
+    if "-o" in args:
+        with open(args[args.index("-o") + 1], "w") as f:
+            f.write("stub")
+        return
+
+    log_bytes = int(os.environ.get("STUB_LOG_BYTES", "0"))
+    line = b"stub: simulator output line with some payload to make it look real ....\n"
+    chunk = line * (65536 // len(line))
+    out = sys.stdout.buffer
+    while log_bytes > 0:
+        out.write(chunk[:log_bytes])
+        log_bytes -= len(chunk)
+    out.flush()
+
+    module = os.environ.get("COCOTB_TEST_MODULES", os.environ.get("MODULE", "stub"))
+    with open(os.environ["COCOTB_RESULTS_FILE"], "w") as f:
+        f.write('<testsuites name="results"><testsuite name="all" package="all">\n')
+        for i in range(int(os.environ.get("STUB_TESTCASES", "1"))):
+            f.write(f'<testcase name="test_{i}" classname="{module}" time="0.001" sim_time_ns="10" ratio_time="1" />\n')
+        f.write("</testsuite></testsuites>\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+import shutil
+import tarfile
+import tempfile
+import urllib.error
+import urllib.request
+
+
+class ArtifactCache:
+    """Storage of build artifacts addressed by build fingerprint.
+
+    Subclasses implement `load` and `store` of an archive file for a key.
+    """
+
+    def load(self, key, archive_file):
+        """Write archive of `key` to `archive_file`, return False if not cached"""
+        raise NotImplementedError()
+
+    def store(self, key, archive_file):
+        """Save `archive_file` as archive of `key`"""
+        raise NotImplementedError()
+
+
+class LocalArtifactCache(ArtifactCache):
+    """Artifacts in a directory, e.g. on a file system shared by CI agents"""
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".tar.gz")
+
+    def load(self, key, archive_file):
+        try:
+            shutil.copyfile(self.path(key), archive_file)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key, archive_file):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # readers never see partial archives
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as f:
+            with open(archive_file, "rb") as archive:
+                shutil.copyfileobj(archive, f)
+        os.replace(f.name, path)
+
+
+class HttpArtifactCache(ArtifactCache):
+    """Artifacts on HTTP server accepting GET and PUT of `<url>/<key>.tar.gz`, e.g. object store"""
+
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def load(self, key, archive_file):
+        try:
+            with urllib.request.urlopen(f"{self.url}/{key}.tar.gz", timeout=self.timeout) as response:
+                with open(archive_file, "wb") as f:
+                    shutil.copyfileobj(response, f)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return False
+            raise
+        return True
+
+    def store(self, key, archive_file):
+        with open(archive_file, "rb") as f:
+            request = urllib.request.Request(
+                f"{self.url}/{key}.tar.gz",
+                data=f,
+                method="PUT",
+                headers={"Content-Length": str(os.path.getsize(archive_file))},
+            )
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+
+
+def get_artifact_cache(cache):
+    """Return ArtifactCache for directory or http(s) URL, instances are returned as is"""
+    if cache is None or isinstance(cache, ArtifactCache):
+        return cache
+    if cache.startswith(("http://", "https://")):
+        return HttpArtifactCache(cache)
+    return LocalArtifactCache(cache)
+
+
+def write_archive(archive_file, base_dir, paths, exclude=None):
+    """Archive files and directories in `paths` relative to `base_dir`, skip names for which `exclude` is true"""
+
+    def filter(info):
+        if exclude is not None and exclude(os.path.basename(info.name)):
+            return None
+        return info
+
+    with tarfile.open(archive_file, "w:gz") as tar:
+        for path in paths:
+            tar.add(path, arcname=os.path.relpath(path, base_dir), filter=filter)
+
+
+def extract_archive(archive_file, base_dir):
+    """Extract archive into `base_dir`, refusing members outside of it"""
+    base_dir = os.path.abspath(base_dir)
+
+    with tarfile.open(archive_file, "r:gz") as tar:
+        for member in tar.getmembers():
+            path = os.path.abspath(os.path.join(base_dir, member.name))
+            if os.path.commonpath([base_dir, path]) != base_dir or not (member.isfile() or member.isdir()):
+                raise tarfile.TarError(f"Unexpected archive member: {member.name}")
+        tar.extractall(base_dir)
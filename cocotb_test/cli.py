@@ -31,7 +31,8 @@
 import os
 import sys
 import argparse
-from cocotb_test import simulator, __version__
+import asyncio
+from cocotb_test import regression, simulator, __version__
 
 
 class PrintAction(argparse.Action):
@@ -82,6 +83,35 @@ def run():
         action="store_true",
         help="Run simulation based on enviroment variables",
     )
+    parser.add_argument(
+        "-r",
+        "--regression",
+        dest="regression",
+        metavar="MANIFEST",
+        help="Run all simulations listed in JSON/YAML manifest, compiling each configuration once",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        type=int,
+        default=None,
+        help="Number of concurrent simulator processes for --regression (default: CPU count)",
+    )
+    parser.add_argument(
+        "--job-memory",
+        dest="job_memory",
+        type=int,
+        default=None,
+        metavar="MB",
+        help="Memory needed by one simulation, limits default --jobs to available memory",
+    )
+    parser.add_argument(
+        "--junit",
+        dest="junit",
+        default="regression.xml",
+        help="Merged junit-xml report of --regression (default: regression.xml)",
+    )
 
     args = parser.parse_args()
 
@@ -101,6 +131,20 @@ def run():
             os.getenv("PYTHONPATH", "").replace(";", " ").replace(":", " ").split()
         )
         simulator.run(**kwargs)
+    elif args.regression:
+        jobs = args.jobs
+        if jobs is None:
+            jobs = regression.default_jobs(args.job_memory * 1024 * 1024 if args.job_memory else None)
+
+        results = asyncio.run(
+            regression.run_regression(regression.load_manifest(args.regression), jobs=jobs, junit_file=args.junit)
+        )
+
+        failed = [name for name, result in results.items() if result.error is not None or result.failed]
+        print(f"{len(results) - len(failed)} passed, {len(failed)} failed, report: {args.junit}")
+        for name in failed:
+            print(f"FAILED {name}: {results[name].error or str(results[name].failed) + ' tests'}")
+        sys.exit(1 if failed else 0)
     else:
         parser.print_help(sys.stderr)
         sys.exit(1)
@@ -1,78 +1,234 @@
+import io
+import json
 import os
-import shutil
+import tempfile
 from xml.etree import cElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+import pytest
+from cocotb_test.results import iter_testsuite_children, read_results
+
+
+def get_results_xml_file(nodeid):
+    """Return path of cocotb results file of test `nodeid`"""
+    results_xml_dir = os.path.abspath(".cocotb-results")
+    return os.path.join(results_xml_dir, nodeid.replace(os.sep, "_").replace("/", "_").replace(":", "-") + ".xml")
+
+
+def report_results(report):
+    """Return cocotb results sent with report by pytest-xdist worker, else results file of the test, or None"""
+    cocotb_xml = getattr(report, "cocotb_xml", None)
+    if cocotb_xml is not None:
+        return io.BytesIO(cocotb_xml.encode("utf-8"))
+
+    results_xml_file = get_results_xml_file(report.nodeid)
+    if os.path.isfile(results_xml_file):
+        return results_xml_file
+    return None
+
+
+def copy_bytes(src, dst, length, chunk_size=1024 * 1024):
+    """Copy `length` bytes from current position of `src` to `dst`"""
+    while length > 0:
+        data = src.read(min(length, chunk_size))
+        if not data:
+            break
+        dst.write(data)
+        length -= len(data)
 
 
 class ResultsCocotb(object):
-    def __init__(self, results_xml_output):
-        self.results_xml_output = results_xml_output
-        self.names = []
-        self.results_xml_dir = os.path.abspath(".cocotb-results")
+    """Collect cocotb results of every test into single junit-xml style report.
 
-    def get_results_xml_file(self, nodeid):
-        return os.path.join(self.results_xml_dir, nodeid.replace(os.sep, "_").replace("/", "_").replace(":", "-") + ".xml")
+    Results are merged as tests finish and only the controller writes the report.
+    pytest-xdist workers attach the results file of a test to its call report as
+    `cocotb_xml`, which is sent to the controller and removed once merged, as
+    reports are kept until the session ends.
+    """
 
+    def __init__(self, results_xml_output, worker=False):
+        self.results_xml_output = results_xml_output
+        self.worker = worker
+        # children of all testsuites are spooled to one temporary file,
+        # (name, package) -> (attributes, [offset, length] segments in spool) of merged testsuites
+        self.spool = None
+        self.suites = {}
+
+    def add_results(self, results_xml_file):
+        for testsuite, element in iter_testsuite_children(results_xml_file):
+            if element.tag == "testcase":
+                element.set("classname", "cocotb." + element.get("classname"))  # add cocotb. for easier selection
+
+            if self.spool is None:
+                self.spool = tempfile.TemporaryFile()
+
+            key = (testsuite.get("name"), testsuite.get("package"))
+            if key not in self.suites:
+                self.suites[key] = (dict(testsuite.attrib), [])
+            segments = self.suites[key][1]
+
+            data = ET.tostring(element, encoding="UTF-8")
+            offset = self.spool.tell()
+            self.spool.write(data)
+
+            if segments and sum(segments[-1]) == offset:
+                segments[-1][1] += len(data)
+            else:
+                segments.append([offset, len(data)])
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        outcome = yield
+        report = outcome.get_result()
+        if report.when != "call":
+            return
+
+        results_xml_file = get_results_xml_file(item.nodeid)
+        results_xml_file_default = os.path.join("sim_build", "results.xml")
+
+        # simulators ignoring COCOTB_RESULTS_FILE write to shared file, only safe without workers
+        if not self.worker and not os.path.isfile(results_xml_file) and os.path.isfile(results_xml_file_default):
+            os.rename(results_xml_file_default, results_xml_file)
+
+        # without workers, results are read from the file once the report is logged
+        if self.worker and os.path.isfile(results_xml_file):
+            with open(results_xml_file, encoding="utf-8") as f:
+                report.cocotb_xml = f.read()
+
+    @pytest.hookimpl(trylast=True)
     def pytest_runtest_logreport(self, report):
-        if report.when == "call" and report.outcome != "skipped":
-            self.names.append(report.nodeid)
+        if not self.worker and report.when == "call" and report.outcome != "skipped":
+            results = report_results(report)
+            if results is not None:
+                self.add_results(results)
+
+        # sent to controller by pytest-xdist or merged, do not keep it with the report
+        if hasattr(report, "cocotb_xml"):
+            del report.cocotb_xml
 
     def pytest_sessionstart(self, session):
-        os.makedirs(self.results_xml_dir, exist_ok=True)
+        os.makedirs(os.path.abspath(".cocotb-results"), exist_ok=True)
 
     def pytest_runtest_setup(self, item):
 
-        cocotb_result_file = self.get_results_xml_file(item._nodeid)
+        cocotb_result_file = get_results_xml_file(item.nodeid)
         if os.path.exists(cocotb_result_file):
             os.remove(cocotb_result_file)
 
-        os.environ["COCOTB_RESULTS_FILE"] = self.get_results_xml_file(item._nodeid)
-        os.environ["RESULT_TESTPACKAGE"] = item._nodeid
+        # every xdist worker is a separate process with its own environment
+        os.environ["COCOTB_RESULTS_FILE"] = cocotb_result_file
+        os.environ["RESULT_TESTPACKAGE"] = item.nodeid
 
     def pytest_sessionfinish(self, session):
+        if self.worker:
+            return
+
+        try:
+            with open(self.results_xml_output, "wb") as f:
+                f.write(b"<?xml version='1.0' encoding='UTF-8'?>\n")
+                f.write(b'<testsuites name="results">')
+                for attrib, segments in self.suites.values():
+                    attributes = "".join(f" {name}={quoteattr(value)}" for name, value in attrib.items())
+                    f.write(f"<testsuite{attributes}>".encode())
+                    for offset, length in segments:
+                        self.spool.seek(offset)
+                        copy_bytes(self.spool, f, length)
+                    f.write(b"</testsuite>")
+                f.write(b"</testsuites>")
+        finally:
+            if self.spool is not None:
+                self.spool.close()
+            self.spool = None
+            self.suites = {}
+
+
+class DurationHistory(object):
+    """Run test modules longest first based on durations measured in earlier sessions.
+
+    Duration of a test is its wall time (setup, call and teardown, including the
+    simulator processes) or the sum of cocotb testcase times if larger, duration of
+    a module the sum of its tests. Tests without history count as the longest known
+    test. Only the controller of pytest-xdist saves history,
+    workers read the same file so their collections stay identical.
+    Cocotb testcase times are known only if `cocotb_results` are collected (--cocotb-xml).
+    """
+
+    def __init__(self, history_file, worker=False, cocotb_results=False):
+        self.history_file = history_file
+        self.worker = worker
+        self.cocotb_results = cocotb_results
+        self.durations = {}
+        self.cocotb_times = {}
+
+        try:
+            with open(self.history_file) as f:
+                self.history = json.load(f)
+        except (OSError, ValueError):
+            self.history = {}
+
+    def pytest_collection_modifyitems(self, session, config, items):
+        if not self.history:
+            return
+
+        # whole modules are moved, so module scoped fixtures are still set up once
+        modules = {}
+        for item in items:
+            modules.setdefault(item.nodeid.split("::")[0], []).append(item)
+
+        unknown = max(self.history.values())
+
+        def duration(module_items):
+            return sum(self.history.get(item.nodeid, unknown) for item in module_items)
+
+        items[:] = [item for module_items in sorted(modules.values(), key=duration, reverse=True) for item in module_items]
+
+    # before --cocotb-xml merged and removed results of the report
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_logreport(self, report):
+        if self.worker:
+            return
 
-        result = ET.Element("testsuites", name="results")
-
-        for nodeid in self.names:
-            fname = self.get_results_xml_file(nodeid)
-
-            if os.path.isfile(fname):
-                tree = ET.parse(fname)
-                for testsuite in tree.iter("testsuite"):
-                    use_element = None
-
-                    for testcase in testsuite.iter("testcase"):
-                        testcase.set("classname", "cocotb." + testcase.get("classname"))  # add cocotb. for easier selection
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0) + report.duration
 
-                    for existing in result:
-                        if existing.get("name") == testsuite.get("name") and (existing.get("package") == testsuite.get("package")):
-                            use_element = existing
-                            break
-                    if use_element is None:
-                        result.append(testsuite)
-                    else:
-                        use_element.extend(list(testsuite))
+        if self.cocotb_results and report.when == "call":
+            results = report_results(report)
+            if results is not None:
+                self.cocotb_times[report.nodeid] = sum(result.wall_time for result in read_results(results))
 
-        ET.ElementTree(result).write(self.results_xml_output, encoding="UTF-8")
+    def pytest_sessionfinish(self, session):
+        if self.worker or not self.durations:
+            return
 
-    def pytest_runtest_teardown(self, item, nextitem):
-        results_xml_file = self.get_results_xml_file(item._nodeid)
-        results_xml_file_defulat = os.path.join("sim_build", "results.xml")
+        for nodeid, duration in self.durations.items():
+            self.history[nodeid] = max(duration, self.cocotb_times.get(nodeid, 0))
 
-        if os.path.isfile(results_xml_file_defulat):
-            os.rename(results_xml_file_defulat, results_xml_file)
+        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(self.history_file), delete=False) as f:
+            json.dump(self.history, f, indent=1, sort_keys=True)
+        os.replace(f.name, self.history_file)
 
 
 def pytest_unconfigure(config):
-    cocotb = getattr(config, "_cocotb", None)
-    if cocotb:
-        config.pluginmanager.unregister(cocotb)
+    for name in ("_cocotb", "_cocotb_history"):
+        plugin = getattr(config, name, None)
+        if plugin:
+            config.pluginmanager.unregister(plugin)
 
 
 def pytest_configure(config):
+    worker = hasattr(config, "workerinput")
+
     if config.option.cocotb_xml:
-        config._cocotb = ResultsCocotb(config.option.cocotb_xml)
+        config._cocotb = ResultsCocotb(config.option.cocotb_xml, worker=worker)
         config.pluginmanager.register(config._cocotb)
 
+    if config.option.cocotb_schedule:
+        history_file = os.path.join(os.path.abspath(".cocotb-results"), "durations.json")
+        config._cocotb_history = DurationHistory(
+            history_file, worker=worker, cocotb_results=config.option.cocotb_xml is not None
+        )
+        config.pluginmanager.register(config._cocotb_history)
+
 
 def pytest_addoption(parser):
     group = parser.getgroup("terminal reporting")
@@ -85,3 +241,11 @@ def pytest_addoption(parser):
         metavar="path",
         help="create junit-xml style report file for cocotb reports at given path.",
     )
+    group = parser.getgroup("general")
+    group.addoption(
+        "--cocotb-schedule",
+        action="store_true",
+        dest="cocotb_schedule",
+        default=False,
+        help="run tests longest first using durations of earlier runs (saved in .cocotb-results/durations.json).",
+    )
@@ -0,0 +1,184 @@
+"""Regression of many simulator runs described by a manifest file.
+
+Manifest is a JSON (or YAML, if PyYAML is installed) list of `run()` arguments,
+or a mapping with `defaults` applied to every entry and the list as `runs`:
+
+    {
+        "defaults": {"verilog_sources": ["dff.sv"], "toplevel": "dff_test"},
+        "runs": [
+            {"module": "dff_cocotb", "seed": 1},
+            {"module": "dff_cocotb", "seed": 2, "parameters": {"WIDTH": 16}}
+        ]
+    }
+
+Entries that differ only in run arguments share one build directory and are
+compiled once before their simulations run.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from xml.etree import cElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+from cocotb_test import simulator
+from cocotb_test.results import iter_testsuite_children
+
+# arguments that do not change the compiled design, `waves` does for most simulators
+RUN_ARGS = (
+    "name",
+    "module",
+    "python_search",
+    "seed",
+    "testcase",
+    "plus_args",
+    "sim_args",
+    "extra_env",
+    "log_file",
+    "log_patterns",
+    "timeouts",
+    "inactivity_timeout",
+    "max_wall_time",
+    "max_cpu_time",
+    "max_memory",
+)
+
+
+def load_manifest(manifest_file):
+    """Return list of run arguments from manifest file"""
+    with open(manifest_file) as f:
+        if manifest_file.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML is required for YAML manifests, use JSON or install pyyaml.")
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
+
+    if isinstance(manifest, dict):
+        defaults = manifest.get("defaults", {})
+        return [dict(defaults, **entry) for entry in manifest["runs"]]
+
+    return manifest
+
+
+def build_key(entry):
+    """Return hash of arguments that change the compiled design"""
+    config = {name: value for name, value in entry.items() if name not in RUN_ARGS}
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def available_memory():
+    """Return bytes of memory available for new processes or None if not known"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_jobs(job_memory=None):
+    """Return number of concurrent runs for CPU count and, if `job_memory` bytes are given, available memory"""
+    jobs = os.cpu_count() or 1
+    memory = available_memory()
+    if job_memory and memory is not None:
+        jobs = min(jobs, memory // job_memory)
+    return max(1, jobs)
+
+
+class JunitWriter:
+    """Write testsuite of every run to junit-xml report as soon as the run finished"""
+
+    def __init__(self, junit_file):
+        os.makedirs(os.path.dirname(os.path.abspath(junit_file)), exist_ok=True)
+        self.file = open(junit_file, "wb")
+        self.file.write(b"<?xml version='1.0' encoding='UTF-8'?>\n")
+        self.file.write(b'<testsuites name="regression">\n')
+
+    def write(self, name, results):
+        attributes = f"name={quoteattr(name)} package={quoteattr(name)}"
+        if results.error is not None:
+            self.file.write(f"<testsuite {attributes} tests=\"1\" failures=\"1\">".encode())
+            testcase = ET.Element("testcase", name="simulation", classname=name, time="0")
+            ET.SubElement(testcase, "failure", message=results.error)
+            self.file.write(ET.tostring(testcase, encoding="UTF-8"))
+        else:
+            self.file.write(
+                f"<testsuite {attributes} tests=\"{len(results.testcases)}\" failures=\"{results.failed}\">".encode()
+            )
+            if results and os.path.isfile(results):
+                for _, element in iter_testsuite_children(results):
+                    self.file.write(ET.tostring(element, encoding="UTF-8"))
+        self.file.write(b"</testsuite>\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.write(b"</testsuites>\n")
+        self.file.close()
+
+
+async def run_regression(entries, jobs=None, junit_file=None, sim_build="sim_build/regression"):
+    """Compile every build configuration of `entries` once, then run all entries.
+
+    At most `jobs` (default: one per CPU) simulator processes compile or run at the
+    same time. Returns dictionary of run name to RunResults.
+    """
+    logger = logging.getLogger("cocotb")
+    semaphore = asyncio.Semaphore(jobs or default_jobs())
+    writer = JunitWriter(junit_file) if junit_file is not None else None
+    results = {}
+
+    runs = []
+    builds = {}
+    for i, entry in enumerate(entries):
+        entry = dict(entry)
+        name = entry.pop("name", f"{i}_{entry.get('module', 'run')}")
+        key = build_key(entry)
+        entry.setdefault("sim_build", os.path.join(sim_build, key))
+        entry.setdefault("log_file", os.path.join(entry["sim_build"], name + ".log"))
+        if key not in builds:
+            # build uses module, timeouts and limits of its first entry
+            builds[key] = dict(entry, log_file=os.path.join(entry["sim_build"], "compile.log"))
+        runs.append((name, key, entry))
+
+    logger.info(f"Regression: {len(runs)} runs of {len(builds)} builds")
+
+    async def arun(**kwargs):
+        # one broken entry (e.g. missing source file) does not abort the regression
+        try:
+            return await simulator.arun(semaphore=semaphore, **kwargs)
+        except Exception as e:
+            logger.error(f"{type(e).__name__}: {e}")
+            return simulator.RunResults("", error=f"{type(e).__name__}: {e}")
+
+    compiled = dict(
+        zip(builds, await asyncio.gather(*[arun(compile_only=True, **kwargs) for kwargs in builds.values()]))
+    )
+
+    async def run_entry(name, key, entry):
+        if compiled[key].error is not None:
+            result = simulator.RunResults("", error=f"Build failed: {compiled[key].error}")
+        else:
+            result = await arun(**entry)
+
+        results[name] = result
+        if writer is not None:
+            writer.write(name, result)
+
+    try:
+        await asyncio.gather(*[run_entry(name, key, entry) for name, key, entry in runs])
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return results
@@ -0,0 +1,89 @@
+import collections
+from xml.etree import cElementTree as ET
+
+TestResult = collections.namedtuple("TestResult", ["name", "classname", "status", "sim_time_ns", "wall_time"])
+
+
+def iter_testsuite_children(results_xml_file):
+    """Yield `(testsuite, element)` for every child element of every testsuite in results file.
+
+    The file is parsed incrementally and elements are dropped once consumed, so memory
+    use does not grow with the number of testcases. `testsuite` only carries attributes.
+    """
+    parents = []
+    for event, elem in ET.iterparse(results_xml_file, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+
+        parents.pop()
+        if not parents:
+            continue
+
+        parent = parents[-1]
+        if parent.tag == "testsuite":
+            yield parent, elem
+
+        if parent.tag in ("testsuite", "testsuites"):
+            parent.remove(elem)
+
+
+def test_result(testcase):
+    """Return TestResult of a testcase element"""
+    if testcase.find("failure") is not None or testcase.find("error") is not None:
+        status = "failed"
+    elif testcase.find("skipped") is not None:
+        status = "skipped"
+    else:
+        status = "passed"
+
+    return TestResult(
+        name=testcase.get("name"),
+        classname=testcase.get("classname"),
+        status=status,
+        sim_time_ns=float(testcase.get("sim_time_ns", 0)),
+        wall_time=float(testcase.get("time", 0)),
+    )
+
+
+def read_results(results_xml_file):
+    """Yield TestResult for every testcase in results file"""
+    for _, element in iter_testsuite_children(results_xml_file):
+        if element.tag == "testcase":
+            yield test_result(element)
+
+
+def add_failure(results_xml_file, name, classname, message):
+    """Add failed testcase to results file, keeping testcases of a readable file"""
+    testsuite = ET.Element("testsuite", name="all", package="all")
+
+    try:
+        for _, element in iter_testsuite_children(results_xml_file):
+            testsuite.append(element)
+    except (OSError, ET.ParseError):  # missing or truncated by terminated simulator
+        pass
+
+    testcase = ET.SubElement(testsuite, "testcase", name=name, classname=classname, time="0", sim_time_ns="0")
+    ET.SubElement(testcase, "failure", message=message)
+
+    testsuites = ET.Element("testsuites", name="results")
+    testsuites.append(testsuite)
+    ET.ElementTree(testsuites).write(results_xml_file, encoding="UTF-8", xml_declaration=True)
+
+
+def append_results(results_xml_file, other_results_xml_file):
+    """Append testsuites of other results file to results file, creating it if missing"""
+    testsuites = ET.Element("testsuites", name="results")
+    suites = {}
+
+    for path in (results_xml_file, other_results_xml_file):
+        try:
+            for testsuite, element in iter_testsuite_children(path):
+                key = (testsuite.get("name"), testsuite.get("package"))
+                if key not in suites:
+                    suites[key] = ET.SubElement(testsuites, "testsuite", testsuite.attrib)
+                suites[key].append(element)
+        except (OSError, ET.ParseError):  # missing or truncated by terminated simulator
+            pass
+
+    ET.ElementTree(testsuites).write(results_xml_file, encoding="UTF-8", xml_declaration=True)
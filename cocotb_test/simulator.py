@@ -5,14 +5,32 @@ import re
 import cocotb
 import logging
 import shutil
-from xml.etree import cElementTree as ET
 import threading
 import signal
+import subprocess
 import warnings
 import find_libpython
 import asyncio
 import sysconfig
+import hashlib
+import json
+import math
+import tarfile
+import struct
+import weakref
+import collections
+import contextlib
+import functools
+import glob
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 from cocotb_test.compat import cocotb_2x_or_newer, cocotb_config
+from cocotb_test.artifacts import extract_archive, get_artifact_cache, write_archive
+from cocotb_test.results import add_failure, append_results, read_results
 
 _magic_re = re.compile(r"([\\{}])")
 _space_re = re.compile(r"([\s])", re.ASCII)
@@ -28,6 +46,13 @@ def as_tcl_value(value):
 
     return value
 
+# Lines of simulator output logged when output is streamed to `log_file`
+DEFAULT_LOG_PATTERNS = {
+    logging.ERROR: r"(?i)\b(error|fatal|failed?)\b",
+    logging.WARNING: r"(?i)\bwarning\b",
+}
+
+
 # Return `variable` if not None, else return `default`
 def some_or(variable, default):
     if variable is None:
@@ -35,6 +60,315 @@ def some_or(variable, default):
     else:
         return variable
 
+
+class Command(list):
+    """Command line tagged with the phase of the flow it belongs to: "compile", "elaborate" or "run".
+
+    `after` lists earlier commands this one depends on, `None` means all preceding commands.
+    """
+
+    def __init__(self, args, phase="compile", after=None):
+        super().__init__(args)
+        self.phase = phase
+        self.after = after
+
+
+class RunResults(str):
+    """Path of cocotb results file, with `profile` of the executed commands and `testcases` results.
+
+    `failed` is the number of failed testcases, `error` the reason of an aborted run or None.
+    """
+
+    def __new__(cls, results_xml_file, profile=None, testcases=None, failed=0, error=None):
+        results = super().__new__(cls, results_xml_file)
+        results.profile = some_or(profile, [])
+        results.testcases = some_or(testcases, [])
+        results.failed = failed
+        results.error = error
+        return results
+
+
+def command_phase(cmd):
+    """Return phase of command, plain lists are treated as compile commands"""
+    return getattr(cmd, "phase", "compile")
+
+
+def try_lock(f):
+    """Try to lock open file exclusively, return True if locked"""
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def unlock(f):
+    if os.name == "nt":
+        import msvcrt
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def shared_lock(path):
+    """Open `path` with a shared lock, waiting while it is locked exclusively.
+
+    Returns the open file, closing it releases the lock. The file is recreated if it
+    was removed while waiting. Shared locks are not available on Windows, None is returned.
+    """
+    if os.name == "nt":
+        return None
+
+    import fcntl
+
+    while True:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = open(path, "a")
+        fcntl.flock(f, fcntl.LOCK_SH)
+        try:
+            if os.path.samestat(os.fstat(f.fileno()), os.stat(path)):
+                return f
+        except FileNotFoundError:  # removed while waiting
+            pass
+        f.close()
+
+
+@contextlib.asynccontextmanager
+async def async_file_lock(path):
+    """Exclusive lock on `path` shared between processes and tasks, waiting does not block event loop"""
+    with open(path, "a") as f:
+        while not try_lock(f):
+            await asyncio.sleep(0.1)
+        try:
+            yield
+        finally:
+            unlock(f)
+
+
+@functools.lru_cache(maxsize=None)
+def libpython_location():
+    return find_libpython.find_libpython()
+
+
+# (os.environ, sys.path, lib_dir, environment) of last call to env_template()
+_env_template = None
+
+
+def env_template(lib_dir):
+    """Return environment common to all simulator runs of this process.
+
+    Rebuilt only when `os.environ`, `sys.path` or `lib_dir` changed since the last call.
+    """
+    global _env_template
+
+    environ = dict(os.environ)
+    sys_path = list(sys.path)
+
+    if _env_template is None or _env_template[:3] != (environ, sys_path, lib_dir):
+        env = dict(environ)
+        env["LIBPYTHON_LOC"] = libpython_location()
+        env["PATH"] += os.pathsep + lib_dir
+        env["PYGPI_PYTHON_BIN"] = sys.executable
+        env["PYTHONPATH"] = os.pathsep.join(sys_path)
+        env["PYTHONHOME"] = sysconfig.get_config_var("prefix")
+        _env_template = (environ, sys_path, lib_dir, env)
+
+    return _env_template[3]
+
+
+def snapshot_path(snapshot_dir, config):
+    """Return directory of the shared elaboration snapshot of `config` in `snapshot_dir`"""
+    config_json = json.dumps(config, sort_keys=True, default=str)
+    path = os.path.join(snapshot_dir, "snapshot_" + hashlib.sha256(config_json.encode()).hexdigest()[:16])
+
+    os.makedirs(path, exist_ok=True)
+    config_file = os.path.join(path, "config.json")
+    if not os.path.isfile(config_file):
+        with open(config_file, "w") as f:
+            f.write(config_json)
+
+    return path
+
+
+def file_digest(path):
+    """Return sha256 digest of file content"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.digest()
+
+
+# inotify(7) events that change content or metadata of watched directory entries
+_IN_CHANGED = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200  # modify, attrib, close write, moves, create, delete
+_IN_GONE = 0x400 | 0x800 | 0x8000  # watched directory deleted, moved or unwatched
+_IN_Q_OVERFLOW = 0x4000
+
+
+def inotify_libc():
+    """Return libc with inotify functions or None if not available"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileCache:
+    """Content digests of files, shared by all simulators of the process.
+
+    On Linux the directories of hashed files, and of symbolic links to them, are
+    watched with inotify and a file is hashed again after a change event. Every
+    file is trusted for at most `ttl` seconds, then checked by size, mtime and
+    inode and hashed again only if those changed. This finds changes inotify does
+    not report, e.g. made on other hosts of network file systems.
+    """
+
+    def __init__(self, ttl=0):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.pid = None
+        self.fd = None
+
+    def reset(self):
+        """Start empty, with own inotify instance in this process"""
+        if self.fd is not None:
+            os.close(self.fd)
+
+        self.pid = os.getpid()
+        # path -> (stat key, digest, time of last check)
+        self.entries = {}
+        # watched path, link or its target -> paths of entries
+        self.aliases = collections.defaultdict(set)
+        # directory -> watch descriptor, descriptor -> directories reaching the same inode
+        self.watches = {}
+        self.watched_dirs = collections.defaultdict(set)
+        self.libc = inotify_libc()
+        self.fd = None
+        if self.libc is not None:
+            fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                self.fd = fd
+
+    def watch(self, directory):
+        """Watch directory, return True if changes of its files are reported"""
+        if self.fd is None:
+            return False
+        if directory not in self.watches:
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), _IN_CHANGED | _IN_GONE)
+            if wd < 0:  # e.g. out of watches, use ttl for this directory
+                self.watches[directory] = None
+                return False
+            self.watches[directory] = wd
+            self.watched_dirs[wd].add(directory)
+        return self.watches[directory] is not None
+
+    def forget(self, watched_path):
+        for path in self.aliases.pop(watched_path, ()):
+            self.entries.pop(path, None)
+
+    def read_events(self):
+        """Forget digests of files changed since last call"""
+        if self.fd is None:
+            return
+
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return
+
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, length = struct.unpack_from("iIII", data, pos)
+                name = data[pos + 16 : pos + 16 + length].rstrip(b"\0")
+                pos += 16 + length
+
+                if mask & _IN_Q_OVERFLOW:
+                    self.entries.clear()
+                    self.aliases.clear()
+                    continue
+
+                directories = self.watched_dirs.get(wd)
+                if not directories:
+                    continue
+
+                if mask & _IN_GONE:
+                    for directory in self.watched_dirs.pop(wd):
+                        del self.watches[directory]
+                        for watched_path in [path for path in self.aliases if os.path.dirname(path) == directory]:
+                            self.forget(watched_path)
+                elif name:
+                    for directory in directories:
+                        self.forget(os.path.join(directory, os.fsdecode(name)))
+
+    def digest(self, path):
+        """Return sha256 digest of file content"""
+        path = os.path.abspath(path)
+
+        with self.lock:
+            if self.pid != os.getpid():
+                # first use, or forked child sharing inotify instance with its parent
+                self.reset()
+
+            self.read_events()
+
+            now = time.monotonic()
+            entry = self.entries.get(path)
+            if entry is not None and now - entry[2] < self.ttl:
+                return entry[1]
+
+            # watch before reading, so changes during hashing are reported,
+            # the directory of a link too, so retargeting it is reported
+            for watched_path in {path, os.path.realpath(path)}:
+                if self.watch(os.path.dirname(watched_path)):
+                    self.aliases[watched_path].add(path)
+
+            stat = os.stat(path)
+            key = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            if entry is not None and entry[0] == key:
+                digest = entry[1]
+            else:
+                digest = file_digest(path)
+
+            self.entries[path] = (key, digest, now)
+            return digest
+
+
+file_cache = FileCache()
+
+
+_include_re = re.compile(rb'`include\s+["<]([^">\r\n]+)[">]')
+
+# content digest -> names of files included by Verilog source
+_include_names = {}
+
+
+def include_names(path, digest):
+    """Return names in `include directives of Verilog file with content `digest`"""
+    names = _include_names.get(digest)
+    if names is None:
+        with open(path, "rb") as f:
+            names = [name.decode("utf-8", errors="replace") for name in _include_re.findall(f.read())]
+        _include_names[digest] = names
+    return names
+
 class Simulator:
     def __init__(
         self,
@@ -64,6 +398,17 @@ class Simulator:
         timescale=None,
         gui=False,
         simulation_args=None,
+        max_build_configs=None,
+        library_dependencies=None,
+        compile_jobs=None,
+        log_file=None,
+        log_patterns=None,
+        max_wall_time=None,
+        max_cpu_time=None,
+        max_memory=None,
+        timeouts=None,
+        inactivity_timeout=None,
+        artifact_cache=None,
         **kwargs,
     ):
 
@@ -84,13 +429,6 @@ class Simulator:
 
         self.module = module  # TODO: Auto discovery, try introspect ?
 
-        self.work_dir = self.sim_dir
-
-        if work_dir is not None:
-            absworkdir = os.path.abspath(work_dir)
-            if os.path.isdir(absworkdir):
-                self.work_dir = absworkdir
-
         # Initialize from arguments
         self.python_search = some_or(python_search, [])
         self.toplevel = toplevel
@@ -110,6 +448,49 @@ class Simulator:
         self.force_compile = force_compile
         self.compile_only = compile_only
         self.waves = bool(some_or(waves, int(os.getenv("WAVES", 0))))
+        self.library_dependencies = library_dependencies
+        self.compile_jobs = some_or(compile_jobs, os.cpu_count() or 1)
+
+        # stream raw output to file, only lines matching patterns are logged
+        self.log_file = os.path.abspath(log_file) if log_file is not None else None
+        self.log_patterns = {
+            level: re.compile(pattern.encode()) for level, pattern in some_or(log_patterns, DEFAULT_LOG_PATTERNS).items()
+        }
+        self.log_lines = 0
+        self.log_bytes = 0
+
+        # phase -> timeout in seconds of each of its processes
+        self.timeouts = dict(some_or(timeouts, {}))
+        if max_wall_time is not None:
+            self.timeouts["run"] = max_wall_time
+
+        # seconds without any output after which a process is considered hung
+        self.inactivity_timeout = inactivity_timeout
+
+        # build artifacts shared by fingerprint between build directories and machines
+        self.artifact_cache = get_artifact_cache(artifact_cache)
+
+        # limits of each simulation process, seconds and bytes
+        self.max_cpu_time = max_cpu_time
+        self.max_memory = max_memory
+        if resource is None and (max_cpu_time is not None or max_memory is not None):
+            warnings.warn("CPU time and memory limits are not supported on this platform.", stacklevel=2)
+
+        # configuration directories are locked while in use, so they are not removed
+        self.config_lock_file = None
+        self.config_lock = None
+        if max_build_configs is not None:
+            if max_build_configs < 1:
+                raise ValueError(f"max_build_configs must be at least 1, got {max_build_configs}")
+            self.sim_dir = self.config_build_dir(max_build_configs)
+            self.config_lock_file = os.path.join(self.sim_dir, "config.lock")
+
+        self.work_dir = self.sim_dir
+
+        if work_dir is not None:
+            absworkdir = os.path.abspath(work_dir)
+            if os.path.isdir(absworkdir):
+                self.work_dir = absworkdir
 
         # by copy since we modify
         self.env = dict(extra_env) if extra_env is not None else {}
@@ -157,72 +538,319 @@ class Simulator:
             signal.signal(signal.SIGINT, self.exit_gracefully)
             signal.signal(signal.SIGTERM, self.exit_gracefully)
 
-        self.process = None
+        self.processes = set()
 
-    def set_env(self):
+        # wall time, cpu time, peak memory and exit code of each executed command
+        self.profile = []
+
+        # fingerprints of outdated outputs, saved once the build succeeded
+        self.pending_fingerprints = {}
 
-        for e in os.environ:
-            self.env[e] = os.environ[e]
+        # fingerprint -> artifacts of outdated outputs, cached once the build succeeded
+        self.pending_artifacts = {}
 
-        self.env["LIBPYTHON_LOC"] = find_libpython.find_libpython()
+        # description and phase of timeout or resource limit exceeded by last run, if any
+        self.limit_exceeded = None
+        self.limit_exceeded_phase = None
 
-        self.env["PATH"] += os.pathsep + self.lib_dir
-        self.env["PYGPI_PYTHON_BIN"] = sys.executable
+    def set_env(self):
+
+        self.env.update(env_template(self.lib_dir))
 
-        self.env["PYTHONPATH"] = os.pathsep.join(sys.path)
         for path in self.python_search:
             self.env["PYTHONPATH"] += os.pathsep + path
 
-        self.env["PYTHONHOME"] = sysconfig.get_config_var("prefix")
-
         self.env["COCOTB_TOPLEVEL" if cocotb_2x_or_newer else "TOPLEVEL"] = self.toplevel_module
         self.env["COCOTB_TEST_MODULES" if cocotb_2x_or_newer else "MODULE"] = self.module
 
         if not os.path.exists(self.sim_dir):
             os.makedirs(self.sim_dir)
 
+    def config_build_dir(self, max_configs):
+        """Return build subdirectory for current parameters and defines.
+
+        Keeps at most `max_configs` configuration directories in `sim_build`,
+        removing the least recently used ones that are not in use by other runs.
+        """
+        config = {
+            "parameters": {str(name): str(value) for name, value in self.parameters.items()},
+            "defines": [str(define) for define in self.defines],
+        }
+        config_json = json.dumps(config, sort_keys=True)
+        config_dir = os.path.join(self.sim_dir, "config_" + hashlib.sha256(config_json.encode()).hexdigest()[:16])
+
+        os.makedirs(config_dir, exist_ok=True)
+        with open(os.path.join(config_dir, "config.json"), "w") as f:
+            f.write(config_json)
+        os.utime(config_dir)  # mark as most recently used
+
+        config_dirs = []
+        for name in os.listdir(self.sim_dir):
+            path = os.path.join(self.sim_dir, name)
+            if name.startswith("config_") and path != config_dir:
+                try:
+                    config_dirs.append((os.path.getmtime(path), path))
+                except FileNotFoundError:  # removed by concurrent run
+                    pass
+
+        for _, path in sorted(config_dirs, reverse=True)[max_configs - 1:]:
+            try:
+                with open(os.path.join(path, "config.lock"), "a") as f:
+                    if not try_lock(f):
+                        continue  # compiling or simulating
+                    self.logger.info(f"Removing least recently used build: {path}")
+                    shutil.rmtree(path, ignore_errors=True)
+            except FileNotFoundError:  # removed by concurrent run
+                pass
+
+        return config_dir
+
     def build_command(self):
         raise NotImplementedError()
 
-    def run(self):
+    def build_lock_file(self):
+        return os.path.join(self.sim_dir, "build.lock")
+
+    def library_commands(self, lib_cmds):
+        """Return compile commands of libraries as dependency graph.
+
+        `lib_cmds` is a list of `(library, command)` pairs in compile order. Commands of
+        one library run in order, libraries follow `library_dependencies`. Without
+        `library_dependencies` all commands run sequentially.
+        """
+        if self.library_dependencies is None:
+            return [cmd for _, cmd in lib_cmds]
+
+        chains = {}
+        for lib, args in lib_cmds:
+            chain = chains.setdefault(lib, [])
+            chain.append(Command(args, after=chain[-1:]))
+
+        cmds = []
+        ordered = []
+        visiting = []
+
+        def visit(lib):
+            if lib in ordered or lib not in chains:
+                return
+            if lib in visiting:
+                raise ValueError("Circular library dependencies: " + " -> ".join(visiting + [lib]))
+            visiting.append(lib)
+            for dep in self.library_dependencies.get(lib, []):
+                visit(dep)
+            visiting.pop()
+
+            chain = chains[lib]
+            chain[0].after = [chains[dep][-1] for dep in self.library_dependencies.get(lib, []) if dep in chains]
+            ordered.append(lib)
+            cmds.extend(chain)
+
+        for lib in chains:
+            visit(lib)
+
+        return cmds
+
+    def prepare_run(self, shared_results=True):
+        """Set up environment and results file of a run, return path of results file.
+
+        `COCOTB_RESULTS_FILE` of the environment is used only if `shared_results` is true.
+        """
+        self.set_env()
 
-        __tracebackhide__ = True  # Hide the traceback when using PyTest.
+        if self.config_lock_file is not None and self.config_lock is None:
+            self.config_lock = shared_lock(self.config_lock_file)
+
+        results_xml_file = os.getenv("COCOTB_RESULTS_FILE") if shared_results else None
 
         # use temporary results file
-        if not os.getenv("COCOTB_RESULTS_FILE"):
+        if not results_xml_file:
             tmp_results_file = tempfile.NamedTemporaryFile(
                 prefix=self.sim_dir + os.path.sep, suffix="_results.xml", delete=False
             )
             results_xml_file = tmp_results_file.name
             tmp_results_file.close()
-            self.env["COCOTB_RESULTS_FILE"] = results_xml_file
-        else:
-            results_xml_file = os.getenv("COCOTB_RESULTS_FILE")
 
-        self.set_env()
-        cmds = self.build_command()
-        self.execute(cmds)
+        self.env["COCOTB_RESULTS_FILE"] = results_xml_file
+        self.profile = []
+        self.limit_exceeded = None
+        self.limit_exceeded_phase = None
 
-        failed = 0
+        if self.log_file is not None:
+            open(self.log_file, "wb").close()
+        self.log_lines = 0
+        self.log_bytes = 0
+
+        return results_xml_file
+
+    def check_run(self, results_xml_file, failed):
+        """Raise SystemExit if flow failed, report exceeded limits in results file"""
+
+        __tracebackhide__ = True  # Hide the traceback when using PyTest.
+
+        if self.limit_exceeded is not None:
+            self.logger.error(self.limit_exceeded)
+            # without simulation there are no testcases to report the failure in
+            if self.compile_only or self.limit_exceeded_phase != "run":
+                raise SystemExit(self.limit_exceeded)
+            add_failure(results_xml_file, "simulation", self.module, self.limit_exceeded)
+        else:
+            self.check_failed(failed)
 
         if not self.compile_only:
             results_file_exist = os.path.isfile(results_xml_file)
             if not results_file_exist:
                 raise SystemExit("ERROR: Simulation terminated abnormally. Cocotb results file not found.")
 
-            tree = ET.parse(results_xml_file)
-            for ts in tree.iter("testsuite"):
-                for tc in ts.iter("testcase"):
-                    for _ in tc.iter("failure"):
-                        self.logger.error(f'Failed: {tc.get("classname")}::{tc.get("name")}')
-                        failed += 1
+    def finish_run(self, results_xml_file):
+        if self.log_file is not None:
+            self.logger.info(f"Log file: {self.log_file} ({self.log_lines} lines, {self.log_bytes} bytes)")
+
+        with open(self.profile_file(results_xml_file), "w") as f:
+            json.dump(self.profile, f, indent=2)
+
+        if self.config_lock is not None:
+            self.config_lock.close()
+            self.config_lock = None
+
+    def _run(self):
+        """Compile and run simulation, return path of results file"""
+
+        __tracebackhide__ = True  # Hide the traceback when using PyTest.
+
+        results_xml_file = self.prepare_run()
+        try:
+            # whole flow runs in a single event loop
+            self.check_run(results_xml_file, asyncio.run(self._exec_flow()))
+        finally:
+            self.finish_run(results_xml_file)
+
+        return results_xml_file
+
+    async def _arun(self):
+        """Compile and run simulation in running event loop, return path of results file"""
+        # concurrent runs must not share results file of the environment
+        results_xml_file = self.prepare_run(shared_results=False)
+        try:
+            self.check_run(results_xml_file, await self._exec_flow())
+        finally:
+            self.finish_run(results_xml_file)
+
+        return results_xml_file
+
+    def profile_file(self, results_xml_file):
+        """Return path of JSON file with profile of commands, next to results file"""
+        return os.path.splitext(results_xml_file)[0] + "_profile.json"
+
+    def read_testcases(self, results_xml_file):
+        """Return list of testcase results and number of failed testcases"""
+        failed = 0
+        testcases = []
+
+        if not self.compile_only:
+            for result in read_results(results_xml_file):
+                if result.status == "failed":
+                    self.logger.error(f"Failed: {result.classname}::{result.name}")
+                    failed += 1
+                testcases.append(result)
+
+        return testcases, failed
+
+    def run(self):
+
+        __tracebackhide__ = True  # Hide the traceback when using PyTest.
+
+        results_xml_file = self._run()
+
+        testcases, failed = self.read_testcases(results_xml_file)
 
         if failed:
             raise SystemExit(f"FAILED {failed} tests.")
 
         self.logger.info(f"Results file: {results_xml_file}")
 
-        return results_xml_file
+        return RunResults(results_xml_file, self.profile, testcases, failed)
+
+    async def arun(self):
+        """Coroutine variant of `run()` for a running event loop.
+
+        Failures are not raised, they are returned in `failed` and `error` of the results.
+        """
+        try:
+            results_xml_file = await self._arun()
+        except SystemExit as e:
+            self.logger.error(str(e))
+            return RunResults(self.env.get("COCOTB_RESULTS_FILE", ""), self.profile, error=str(e))
+
+        # collect testcases in results file of the environment, e.g. set by --cocotb-xml
+        if os.getenv("COCOTB_RESULTS_FILE") and not self.compile_only:
+            append_results(os.getenv("COCOTB_RESULTS_FILE"), results_xml_file)
+
+        testcases, failed = self.read_testcases(results_xml_file)
+
+        self.logger.info(f"Results file: {results_xml_file}")
+
+        return RunResults(results_xml_file, self.profile, testcases, failed)
+
+    def testcase_filter(self, testcases):
+        """Return value of testcase environment variable selecting all `testcases`"""
+        if cocotb_2x_or_newer:
+            # regular expression matched against `<module>.<testcase>`
+            return "(^|\\.)(" + "|".join(re.escape(testcase) for testcase in testcases) + ")$"
+        return ",".join(testcases)
+
+    def module_testcases(self):
+        """Return names of cocotb tests in `module` or None if the module can not be imported.
+
+        The module is imported by a separate Python process with the simulation environment.
+        """
+        script = (
+            "import importlib, sys\n"
+            "for name in sys.argv[1:]:\n"
+            "    for attr, value in vars(importlib.import_module(name)).items():\n"
+            "        if hasattr(value, 'im_test'):\n"
+            "            print(attr)\n"
+        )
+        modules = [module.strip() for module in self.module.split(",") if module.strip()]
+
+        self.set_env()
+        process = subprocess.run(
+            [sys.executable, "-c", script] + modules, env=self.env, cwd=self.work_dir, capture_output=True, text=True
+        )
+        if process.returncode:
+            self.logger.warning(f"Unable to list tests of {self.module}: {process.stderr.strip()}")
+            return None
+
+        return set(process.stdout.split())
+
+    def run_batch(self, testcases):
+        """Run all `testcases` in a single simulator invocation.
+
+        Returns dictionary with "passed", "failed", "skipped" or "missing" status of each testcase.
+        """
+
+        __tracebackhide__ = True  # Hide the traceback when using PyTest.
+
+        results = {testcase: "missing" for testcase in testcases}
+
+        if not cocotb_2x_or_newer:
+            # cocotb 1.x aborts the whole regression if a selected test does not exist
+            known = self.module_testcases()
+            if known is not None:
+                testcases = [testcase for testcase in testcases if testcase in known]
+                if not testcases:
+                    return results
+
+        self.env["COCOTB_TEST_FILTER" if cocotb_2x_or_newer else "TESTCASE"] = self.testcase_filter(testcases)
+
+        results_xml_file = self._run()
+
+        if not self.compile_only:
+            for result in read_results(results_xml_file):
+                results[result.name] = result.status
+
+        self.logger.info(f"Results file: {results_xml_file}")
+
+        return results
 
     def get_include_commands(self, includes):
         raise NotImplementedError()
@@ -251,7 +879,7 @@ class Simulator:
                 libs[lib] = self.normalize_paths(src)
             return libs
 
-    async def _log_pipe(self, level, stream):
+    async def _log_pipe(self, level, stream, activity=None):
         line = bytearray()
         while not stream.at_eof():
             try:
@@ -260,81 +888,443 @@ class Simulator:
                 line.extend(e.partial)
             except asyncio.LimitOverrunError as e:
                 line.extend(await stream.read(e.consumed))
+                if activity is not None:
+                    activity()
                 continue
 
+            if activity is not None:
+                activity()
+
             if line:
                 self.logger.log(level, line.decode("utf-8").rstrip())
             line.clear()
 
+    def _log_matching(self, data):
+        # line start -> (level, line), highest level wins
+        lines = {}
+        for level, pattern in sorted(self.log_patterns.items(), reverse=True):
+            pos = 0
+            while True:
+                match = pattern.search(data, pos)
+                if match is None:
+                    break
+                start = data.rfind(b"\n", 0, match.start()) + 1
+                end = data.find(b"\n", match.end())
+                if end < 0:
+                    end = len(data)
+                lines.setdefault(start, (level, data[start:end]))
+                pos = end + 1
+
+        for start in sorted(lines):
+            level, line = lines[start]
+            self.logger.log(level, line.decode("utf-8", errors="replace").rstrip())
+
+    async def _stream_pipe(self, stream, log, activity=None):
+        """Copy output to log file in chunks, log only lines matching `log_patterns`"""
+        partial = b""
+        while True:
+            chunk = await stream.read(1 << 16)
+            if not chunk:
+                break
+
+            if activity is not None:
+                activity()
+
+            log.write(chunk)
+            self.log_bytes += len(chunk)
+            self.log_lines += chunk.count(b"\n")
+
+            # match complete lines only
+            data = partial + chunk
+            end = data.rfind(b"\n") + 1
+            partial = data[end:]
+            if end:
+                self._log_matching(data[:end])
+
+        if partial:
+            self.log_lines += 1
+            self._log_matching(partial)
+
+    def set_limits(self):
+        """Apply CPU time and memory limits in child process before exec"""
+        if self.max_cpu_time is not None:
+            soft, hard = self.cpu_time_limits()
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+        if self.max_memory is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (int(self.max_memory), int(self.max_memory)))
+
+    def cpu_time_limits(self):
+        """Return soft (SIGXCPU) and hard (SIGKILL) CPU time limits in whole seconds"""
+        soft = math.ceil(self.max_cpu_time)
+        return soft, soft + 5
+
+    def exceeded_limit(self, cmds, returncode, cpu_time=None):
+        """Return description of resource limit that terminated process or None.
+
+        `cpu_time` is the measured CPU time of the process, a SIGKILL is attributed to
+        the CPU time limit only if it reached the hard limit.
+        """
+        if self.max_cpu_time is not None and (
+            returncode == -signal.SIGXCPU
+            or (returncode == -signal.SIGKILL and cpu_time is not None and cpu_time >= self.cpu_time_limits()[1])
+        ):
+            return f"Process {cmds[0]} exceeded CPU time limit of {self.max_cpu_time} s"
+        if self.max_memory is not None and returncode in (-signal.SIGSEGV, -signal.SIGABRT, -signal.SIGBUS):
+            # failed allocations end in an abort or segmentation fault, other errors fail the run as usual
+            return f"Process {cmds[0]} terminated with signal {-returncode} under memory limit of {self.max_memory} bytes"
+        return None
+
     async def _exec(self, cmds):
 
+        start = time.monotonic()
+        if resource is not None:
+            usage_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        phase = command_phase(cmds)
+        timeout = self.timeouts.get(phase)
+
+        # resource limits apply to simulation, not to compilation
+        limited = phase == "run"
+        preexec_fn = None
+        if limited and resource is not None and (self.max_cpu_time is not None or self.max_memory is not None):
+            preexec_fn = self.set_limits
+
+        watched = timeout is not None or self.inactivity_timeout is not None
+
         p = await asyncio.create_subprocess_exec(
             *cmds,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
             cwd=self.work_dir,
             env=self.env,
+            preexec_fn=preexec_fn,
+            # own process group, so hung process can be killed with its children
+            start_new_session=watched and os.name != "nt",
         )
 
-        self.process = p
+        self.processes.add(p)
 
-        await asyncio.wait(
-            [
-                asyncio.create_task(self._log_pipe(logging.INFO, p.stdout)),
-                asyncio.create_task(self._log_pipe(logging.ERROR, p.stderr)),
-            ]
-        )
+        last_output = time.monotonic()
+
+        def activity():
+            nonlocal last_output
+            last_output = time.monotonic()
+
+        async def communicate():
+            if self.log_file is not None:
+                with open(self.log_file, "ab") as log:
+                    await asyncio.wait(
+                        [
+                            asyncio.create_task(self._stream_pipe(p.stdout, log, activity)),
+                            asyncio.create_task(self._stream_pipe(p.stderr, log, activity)),
+                        ]
+                    )
+            else:
+                await asyncio.wait(
+                    [
+                        asyncio.create_task(self._log_pipe(logging.INFO, p.stdout, activity)),
+                        asyncio.create_task(self._log_pipe(logging.ERROR, p.stderr, activity)),
+                    ]
+                )
+
+            await p.wait()
+
+        async def watchdog():
+            while True:
+                idle = time.monotonic() - last_output
+                if idle >= self.inactivity_timeout:
+                    return
+                await asyncio.sleep(self.inactivity_timeout - idle)
+
+        tasks = [asyncio.ensure_future(communicate())]
+        if self.inactivity_timeout is not None:
+            tasks.append(asyncio.ensure_future(watchdog()))
+
+        limit_exceeded = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if tasks[0] not in done:
+                if done:
+                    limit_exceeded = f"Process {cmds[0]} produced no output for {self.inactivity_timeout} s"
+                else:
+                    limit_exceeded = f"Process {cmds[0]} exceeded {phase} timeout of {timeout} s"
+                self.logger.error(limit_exceeded + ", killing it")
+                self.kill_process(p)
+                await p.wait()
+        except asyncio.CancelledError:
+            # cancelled commands do not leave processes behind
+            self.kill_process(p)
+            await p.wait()
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.processes.discard(p)
+
+        # children usage is process wide, concurrent commands share their deltas
+        record = {
+            "command": list(cmds),
+            "phase": phase,
+            "wall_time": time.monotonic() - start,
+            "returncode": p.returncode,
+        }
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+            record["user_time"] = usage.ru_utime - usage_start.ru_utime
+            record["system_time"] = usage.ru_stime - usage_start.ru_stime
+            # largest peak RSS of any child waited for by this process so far, not of this command
+            record["children_max_rss_kib"] = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+        if limit_exceeded is None and limited:
+            cpu_time = record["user_time"] + record["system_time"] if resource is not None else None
+            limit_exceeded = self.exceeded_limit(cmds, p.returncode, cpu_time)
+
+        if limit_exceeded is not None:
+            record["limit_exceeded"] = limit_exceeded
+            self.limit_exceeded = limit_exceeded
+            self.limit_exceeded_phase = phase
+
+        self.profile.append(record)
+
+        return p.returncode
+
+    async def _exec_graph(self, cmds):
+        """Run commands, independent ones concurrently on up to `compile_jobs` processes.
+
+        Returns list of `(command, returncode)` of failed commands.
+        """
+
+        jobs = asyncio.Semaphore(self.compile_jobs)
+        tasks = {}
+        failed = []
+
+        async def exec_node(cmd, deps):
+            if not all(await asyncio.gather(*deps)):
+                return False  # dependency failed
+
+            async with jobs:
+                self.logger.info("Running command: " + " ".join(cmd))
+                returncode = await self._exec(cmd)
+
+            if returncode:
+                failed.append((cmd, returncode))
+                # stop remaining commands, the flow fails anyway
+                for task in tasks.values():
+                    if task is not asyncio.current_task():
+                        task.cancel()
+                return False
+
+            return True
+
+        for i, cmd in enumerate(cmds):
+            after = getattr(cmd, "after", None)
+            deps = cmds[:i] if after is None else after
+            deps = [tasks[id(dep)] for dep in deps if id(dep) in tasks]
+            tasks[id(cmd)] = asyncio.ensure_future(exec_node(cmd, deps))
+
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        return failed
+
+    async def _exec_flow(self):
+        """Compile and run simulation, return list of failed commands"""
+
+        # Only one process compiles in sim_build, others wait and reuse the result
+        async with async_file_lock(self.build_lock_file()):
+            cmds = self.build_command()
+            failed = await self._exec_graph([cmd for cmd in cmds if command_phase(cmd) != "run"])
+            if failed:
+                return failed
+            self.save_fingerprints()
+            self.save_artifacts()
+
+        return await self._exec_graph([cmd for cmd in cmds if command_phase(cmd) == "run"])
 
-        await p.wait()
+    def check_failed(self, failed):
+
+        __tracebackhide__ = True  # Hide the traceback when using PyTest.
+
+        if failed:
+            cmd, returncode = failed[0]
+            raise SystemExit(f"Process {cmd[0]} terminated with error {returncode}")
 
     def execute(self, cmds):
 
         __tracebackhide__ = True  # Hide the traceback when using PyTest.
 
-        for cmd in cmds:
-            self.logger.info("Running command: " + " ".join(cmd))
+        self.check_failed(asyncio.run(self._exec_graph(cmds)))
 
-            asyncio.run(self._exec(cmd))
+    def find_include(self, name, including_file):
+        """Return path of included file as found by compiler or None"""
+        if os.path.isabs(name):
+            return name if os.path.isfile(name) else None
 
-            if self.process.returncode:
-                raise SystemExit(f"Process {cmd[0]} terminated with error {self.process.returncode}")
+        for include_dir in [os.path.dirname(including_file)] + self.includes + [self.work_dir]:
+            path = os.path.join(include_dir, name)
+            if os.path.isfile(path):
+                return os.path.normpath(path)
 
-            self.process = None
+        return None
 
-    def outdated_list(self, output, dependencies):
+    def file_digests(self, dependencies):
+        """Return `(path, digest)` of dependencies and of files they include, transitively.
 
-        if not os.path.isfile(output):
-            return True
+        Only Verilog sources and included files are scanned for `include directives,
+        includes that cannot be resolved are ignored.
+        """
+        # all libraries, sources are a dict once formatted
+        verilog_sources = set()
+        if self.verilog_sources:
+            verilog_sources.update(src for sources in self.verilog_sources.values() for src in sources)
 
-        output_mtime = os.path.getmtime(output)
+        digests = []
+        seen = set()
+        pending = collections.deque((file, file in verilog_sources) for file in dependencies)
 
-        dep_mtime = 0
-        for file in dependencies:
-            mtime = os.path.getmtime(file)
-            if mtime > dep_mtime:
-                dep_mtime = mtime
+        while pending:
+            file, scan = pending.popleft()
+            if file in seen:
+                continue
+            seen.add(file)
 
-        if dep_mtime > output_mtime:
-            return True
+            digest = file_cache.digest(file)
+            digests.append((file, digest))
 
-        return False
+            if scan:
+                for name in include_names(file, digest):
+                    path = self.find_include(name, file)
+                    if path is not None:
+                        pending.append((path, True))
 
-    def outdated(self, output, dependencies):
-        if isinstance(dependencies, list):
-            return self.outdated_list(output, dependencies)
+        return digests
 
-        for sources in dependencies.values():
-            if self.outdated_list(output, sources):
-                return True
+    def fingerprint(self, dependencies, commands=None):
+        """Return content hash of sources, included files, compile commands and tools"""
+        hasher = hashlib.sha256()
 
-        return False
+        for file, digest in self.file_digests(dependencies):
+            hasher.update(file.encode())
+            hasher.update(digest)
+
+        if commands is not None:
+            # independent of build directory location, so artifacts can be shared
+            hasher.update(json.dumps(commands, default=str).replace(self.sim_dir, "$SIM_BUILD").encode())
+
+            # tool version changes are detected by executable size and mtime
+            for cmd in commands:
+                exe = shutil.which(cmd[0])
+                if exe is not None:
+                    stat = os.stat(exe)
+                    hasher.update(f"{exe}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+        return hasher.hexdigest()
+
+    def fingerprint_file(self, output):
+        return os.path.join(self.sim_dir, os.path.basename(output) + ".fingerprint")
+
+    def outdated_list(self, output, dependencies, commands=None, artifacts=None):
+
+        fingerprint_file = self.fingerprint_file(output)
+        fingerprint = self.fingerprint(dependencies, commands)
+
+        stored = None
+        if os.path.isfile(output) and os.path.isfile(fingerprint_file):
+            with open(fingerprint_file) as f:
+                stored = f.read().strip()
+
+        if stored == fingerprint:
+            return False
+
+        # invalidate until the new build has succeeded
+        if os.path.isfile(fingerprint_file):
+            os.remove(fingerprint_file)
+
+        if artifacts is not None and self.artifact_cache is not None and not self.force_compile:
+            if self.restore_artifacts(fingerprint) and os.path.isfile(output):
+                with open(fingerprint_file, "w") as f:
+                    f.write(fingerprint)
+                return False
+            self.pending_artifacts[fingerprint] = artifacts
+
+        self.pending_fingerprints[fingerprint_file] = fingerprint
+
+        return True
+
+    def outdated(self, output, dependencies, commands=None, artifacts=None):
+        """Return True if `output` has to be built.
+
+        `artifacts` are glob patterns of files and directories in `sim_build` restored
+        from and saved to `artifact_cache` for the fingerprint of the build.
+        """
+        if isinstance(dependencies, dict):
+            dependencies = [src for sources in dependencies.values() for src in sources]
+
+        return self.outdated_list(output, dependencies, commands, artifacts)
+
+    def save_fingerprints(self):
+        for fingerprint_file, fingerprint in self.pending_fingerprints.items():
+            with open(fingerprint_file, "w") as f:
+                f.write(fingerprint)
+
+        self.pending_fingerprints.clear()
+
+    def artifact_excluded(self, name):
+        """Return True for files in `sim_build` that are not build artifacts"""
+        return (
+            name in ("build.lock", "config.json", "config.lock")
+            or name.endswith((".fingerprint", "_results.xml", "_profile.json"))
+            or (self.log_file is not None and name == os.path.basename(self.log_file))
+        )
+
+    def restore_artifacts(self, fingerprint):
+        """Extract artifacts of build with `fingerprint` into `sim_build`, return True if found"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            archive_file = os.path.join(tmp_dir, "artifacts.tar.gz")
+            try:
+                if not self.artifact_cache.load(fingerprint, archive_file):
+                    return False
+                extract_archive(archive_file, self.sim_dir)
+            except (OSError, tarfile.TarError) as e:
+                self.logger.warning(f"Artifact cache not available: {e}")
+                return False
+
+        self.logger.info(f"Restored build artifacts: {fingerprint}")
+        return True
+
+    def save_artifacts(self):
+        for fingerprint, artifacts in self.pending_artifacts.items():
+            # outputs are known only once built, e.g. library files named by VHDL standard
+            paths = sorted({path for pattern in artifacts for path in glob.glob(pattern)})
+            if not paths:
+                continue
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                archive_file = os.path.join(tmp_dir, "artifacts.tar.gz")
+                try:
+                    write_archive(archive_file, self.sim_dir, paths, self.artifact_excluded)
+                    self.artifact_cache.store(fingerprint, archive_file)
+                except OSError as e:
+                    self.logger.warning(f"Artifact cache not available: {e}")
+
+        self.pending_artifacts.clear()
+
+    def kill_process(self, process):
+        """Kill process and, if it runs in its own session, all its children"""
+        if os.name != "nt":
+            try:
+                if os.getpgid(process.pid) == process.pid:
+                    os.killpg(process.pid, signal.SIGKILL)
+                    return
+            except ProcessLookupError:  # already finished
+                return
+        process.kill()
 
     def exit_gracefully(self, signum, frame):
         pid = None
-        if self.process is not None:
-            pid = self.process.pid
-            self.process.kill()
-            self.process.wait()
+        for process in list(self.processes):
+            pid = process.pid
+            self.kill_process(process)
         # Restore previous handlers
         signal.signal(signal.SIGINT, self.old_sigint_h)
         signal.signal(signal.SIGTERM, self.old_sigterm_h)
@@ -477,21 +1467,29 @@ class Icarus(Simulator):
             with open(timescale_cmd_file, "w") as f:
                 f.write(f"+timescale+{self.timescale}\n")
             self.compile_args.extend(["-f", timescale_cmd_file])
+            verilog_sources.append(timescale_cmd_file)
 
         cmd = []
-        if self.outdated(self.sim_file, verilog_sources) or self.force_compile:
-            cmd.append(self.compile_command())
+        cmd_compile = self.compile_command()
+        if self.outdated(self.sim_file, verilog_sources, [cmd_compile], [glob.escape(self.sim_file)]) or self.force_compile:
+            cmd.append(cmd_compile)
         else:
             self.logger.warning(f"Skipping compilation:{self.sim_file}")
 
         # TODO: check dependency?
         if not self.compile_only:
-            cmd.append(self.run_command())
+            cmd.append(Command(self.run_command(), phase="run"))
 
         return cmd
 
 
 class Questa(Simulator):
+    def __init__(self, *argv, vopt=False, **kwargs):
+        super().__init__(*argv, **kwargs)
+
+        # optimize design once per configuration instead of at every vsim start
+        self.vopt = vopt
+
     def get_include_commands(self, includes):
         return [f"+incdir+{as_tcl_value(dir)}" for dir in includes]
 
@@ -512,6 +1510,7 @@ class Questa(Simulator):
     def build_command(self):
 
         cmd = []
+        lib_cmds = []
 
         do_script = self.do_script()
 
@@ -519,13 +1518,13 @@ class Questa(Simulator):
             compile_args = self.compile_args + self.extra_args + self.vhdl_compile_args
 
             for lib, src in self.vhdl_sources.items():
-                cmd.append(["vlib", as_tcl_value(lib)])
-                cmd.append(
+                cmd_vcom = (
                     ["vcom"]
                     + ["-work", as_tcl_value(lib)]
                     + compile_args
                     + [as_tcl_value(v) for v in src]
                 )
+                lib_cmds += [(lib, ["vlib", as_tcl_value(lib)]), (lib, cmd_vcom)]
 
         if self.verilog_sources:
             compile_args = self.compile_args + self.extra_args + self.verilog_compile_args
@@ -533,8 +1532,7 @@ class Questa(Simulator):
                 compile_args += ["-timescale", self.timescale]
 
             for lib, src in self.verilog_sources.items():
-                cmd.append(["vlib", as_tcl_value(lib)])
-                cmd.append(
+                cmd_vlog = (
                     ["vlog"]
                     + ([] if self.force_compile else ["-incr"])
                     + ["-work", as_tcl_value(lib)]
@@ -545,10 +1543,58 @@ class Questa(Simulator):
                     + compile_args
                     + [as_tcl_value(v) for v in src]
                 )
+                lib_cmds += [(lib, ["vlib", as_tcl_value(lib)]), (lib, cmd_vlog)]
+
+        toplevel = self.toplevel
+        parameter_args = [as_tcl_value(v) for v in self.get_parameter_commands(self.parameters)]
+
+        # sources of all libraries
+        sources = []
+        for lib_sources in (self.verilog_sources, self.vhdl_sources):
+            if lib_sources:
+                sources += [src for src_list in lib_sources.values() for src in src_list]
+
+        if self.vopt:
+            cmd_vopt = (
+                ["vopt"]
+                + (["+acc"] if self.waves else [])
+                + ["-work", as_tcl_value(self.toplevel_library)]
+                + parameter_args
+                + self.toplevel
+            )
+            unit = "cocotb_opt_" + hashlib.sha256(json.dumps(cmd_vopt).encode()).hexdigest()[:16]
+            cmd_vopt += ["-o", unit]
+
+            # marker of optimized unit, its fingerprint covers sources and compile commands
+            out_file = os.path.join(self.sim_dir, unit + ".vopt")
+            if not os.path.isfile(out_file):
+                with open(out_file, "w") as f:
+                    f.write(json.dumps(cmd_vopt))
+
+            # vcom recompiles every time, so units are compiled only with the unit optimized against them
+            if self.outdated(out_file, sources, [cmd for _, cmd in lib_cmds] + [cmd_vopt]) or self.force_compile:
+                cmd += self.library_commands(lib_cmds)
+                cmd.append(Command(cmd_vopt, phase="elaborate"))
+            else:
+                self.logger.warning(f"Skipping compilation and optimization:{out_file}")
+
+            # parameters are part of optimized unit
+            toplevel = [f"{self.toplevel_library}.{unit}"]
+            parameter_args = []
+        else:
+            # marker of compiled libraries, vcom recompiles every time
+            out_file = os.path.join(self.sim_dir, "libraries.questa")
+            if not os.path.isfile(out_file):
+                open(out_file, "w").close()
+
+            if self.outdated(out_file, sources, [cmd for _, cmd in lib_cmds]) or self.force_compile:
+                cmd += self.library_commands(lib_cmds)
+            else:
+                self.logger.warning(f"Skipping compilation:{out_file}")
 
         if not self.compile_only:
             if self.toplevel_lang == "vhdl":
-                cmd.append(
+                cmd_run = (
                     ["vsim"]
                     + ["-gui" if self.gui else "-c"]
                     + ["-onfinish", "stop" if self.gui else "exit"]
@@ -557,14 +1603,14 @@ class Questa(Simulator):
                         "cocotb_init " + as_tcl_value(cocotb_config.lib_name_path("fli", "questa")),
                     ]
                     + self.simulation_args
-                    + [as_tcl_value(v) for v in self.get_parameter_commands(self.parameters)]
-                    + self.toplevel
+                    + parameter_args
+                    + toplevel
                     + ["-do", do_script]
                 )
                 if self.verilog_sources:
                     self.env["GPI_EXTRA"] = str(cocotb_config.lib_name_path("vpi", "questa")) + ":cocotbvpi_entry_point"
             else:
-                cmd.append(
+                cmd_run = (
                     ["vsim"]
                     + ["-gui" if self.gui else "-c"]
                     + ["-onfinish", "stop" if self.gui else "exit"]
@@ -573,14 +1619,16 @@ class Questa(Simulator):
                         as_tcl_value(cocotb_config.lib_name_path("vpi", "questa")),
                     ]
                     + self.simulation_args
-                    + [as_tcl_value(v) for v in self.get_parameter_commands(self.parameters)]
-                    + self.toplevel
+                    + parameter_args
+                    + toplevel
                     + [as_tcl_value(v) for v in self.plus_args]
                     + ["-do", do_script]
                 )
                 if self.vhdl_sources:
                     self.env["GPI_EXTRA"] = str(cocotb_config.lib_name_path("fli", "questa")) + ":cocotbfli_entry_point"
 
+            cmd.append(Command(cmd_run, phase="run"))
+
         return cmd
 
 
@@ -589,7 +1637,45 @@ class Modelsim(Questa):
     pass
 
 
-class Ius(Simulator):
+class SnapshotSimulator(Simulator):
+    """Simulator elaborating into a snapshot directory shared by all runs of the same configuration"""
+
+    snapshot_tool = None
+
+    def __init__(self, *argv, snapshot_dir=None, **kwargs):
+        super().__init__(*argv, **kwargs)
+
+        # elaborate once per configuration into directory shared by all runs
+        self.snapshot = None
+        if snapshot_dir is not None:
+            self.snapshot = snapshot_path(os.path.abspath(snapshot_dir), self.snapshot_config())
+
+    def snapshot_config(self):
+        return {
+            "simulator": self.snapshot_tool,
+            "toplevel": self.toplevel_module,
+            "sources": self.verilog_sources_flat + self.vhdl_sources_flat,
+            "includes": self.includes,
+            "defines": [str(define) for define in self.defines],
+            "parameters": {str(name): str(value) for name, value in self.parameters.items()},
+            "args": self.compile_args + self.extra_args,
+            "timescale": self.timescale,
+        }
+
+    def build_lock_file(self):
+        if self.snapshot is not None:
+            return os.path.join(self.snapshot, "build.lock")
+        return super().build_lock_file()
+
+    def fingerprint_file(self, output):
+        if self.snapshot is not None:
+            return os.path.join(self.snapshot, os.path.basename(output) + ".fingerprint")
+        return super().fingerprint_file(output)
+
+
+class Ius(SnapshotSimulator):
+    snapshot_tool = "ius"
+
     def __init__(self, *argv, **kwargs):
         super().__init__(*argv, **kwargs)
 
@@ -628,33 +1714,39 @@ class Ius(Simulator):
         ), "'Ius' simulator does not allow HDL specific compile arguments."
 
         out_file = os.path.join(self.sim_dir, "INCA_libs", "history")
+        snapshot_args = []
+        if self.snapshot is not None:
+            out_file = os.path.join(self.snapshot, "config.json")
+            snapshot_args = ["-nclibdirpath", self.snapshot, "-snapshot", os.path.basename(self.snapshot)]
 
         cmd = []
 
-        if self.outdated(out_file, self.verilog_sources_flat + self.vhdl_sources_flat) or self.force_compile:
-            cmd_elab = (
-                [
-                    "irun",
-                    "-64",
-                    "-elaborate",
-                    "-define",
-                    "COCOTB_SIM=1",
-                    "-loadvpi",
-                    str(cocotb_config.lib_name_path("vpi", "ius")) + ":vlog_startup_routines_bootstrap",
-                    "-plinowarn",
-                    "-access",
-                    "+rwc",
-                    "-top",
-                    self.toplevel_module,
-                ]
-                + self.get_define_commands(self.defines)
-                + self.get_include_commands(self.includes)
-                + self.get_parameter_commands(self.parameters)
-                + self.compile_args + self.extra_args
-                + self.verilog_sources_flat
-                + self.vhdl_sources_flat
-            )
-            cmd.append(cmd_elab)
+        cmd_elab = (
+            [
+                "irun",
+                "-64",
+                "-elaborate",
+                "-define",
+                "COCOTB_SIM=1",
+                "-loadvpi",
+                str(cocotb_config.lib_name_path("vpi", "ius")) + ":vlog_startup_routines_bootstrap",
+                "-plinowarn",
+                "-access",
+                "+rwc",
+                "-top",
+                self.toplevel_module,
+            ]
+            + snapshot_args
+            + self.get_define_commands(self.defines)
+            + self.get_include_commands(self.includes)
+            + self.get_parameter_commands(self.parameters)
+            + self.compile_args + self.extra_args
+            + self.verilog_sources_flat
+            + self.vhdl_sources_flat
+        )
+
+        if self.outdated(out_file, self.verilog_sources_flat + self.vhdl_sources_flat, [cmd_elab]) or self.force_compile:
+            cmd.append(Command(cmd_elab, phase="elaborate"))
 
         else:
             self.logger.warning("Skipping compilation:" + out_file)
@@ -662,16 +1754,19 @@ class Ius(Simulator):
         if not self.compile_only:
             cmd_run = (
                 ["irun", "-64", "-R", ("-gui" if self.gui else "")]
+                + snapshot_args
                 + self.simulation_args
                 + self.get_parameter_commands(self.parameters)
                 + self.plus_args
             )
-            cmd.append(cmd_run)
+            cmd.append(Command(cmd_run, phase="run"))
 
         return cmd
 
 
-class Xcelium(Simulator):
+class Xcelium(SnapshotSimulator):
+    snapshot_tool = "xcelium"
+
     def __init__(self, *argv, **kwargs):
         super().__init__(*argv, **kwargs)
 
@@ -709,37 +1804,41 @@ class Xcelium(Simulator):
         ), "'Xcelium' simulator does not allow HDL specific compile arguments."
 
         out_file = os.path.join(self.sim_dir, "INCA_libs", "history")
+        snapshot_args = []
+        if self.snapshot is not None:
+            out_file = os.path.join(self.snapshot, "config.json")
+            snapshot_args = ["-xmlibdirpath", self.snapshot, "-snapshot", os.path.basename(self.snapshot)]
 
         cmd = []
 
-        if self.outdated(out_file, self.verilog_sources_flat + self.vhdl_sources_flat) or self.force_compile:
-
-            cmd_elab = (
-                [
-                    "xrun",
-                    "-64",
-                    "-elaborate",
-                    "-define",
-                    "COCOTB_SIM=1",
-                    "-loadvpi",
-                    str(cocotb_config.lib_name_path("vpi", "xcelium")) + ":vlog_startup_routines_bootstrap",
-                    "-plinowarn",
-                    "-access",
-                    "+rwc",
-                    "-top",
-                    self.toplevel_module,
-                ]
-                + self.get_define_commands(self.defines)
-                + self.get_include_commands(self.includes)
-                + self.get_parameter_commands(self.parameters)
-                + self.compile_args + self.extra_args
-                + self.verilog_sources_flat
-                + self.vhdl_sources_flat
-            )
-            if self.timescale:
-                cmd_elab += ["-timescale", self.timescale]
+        cmd_elab = (
+            [
+                "xrun",
+                "-64",
+                "-elaborate",
+                "-define",
+                "COCOTB_SIM=1",
+                "-loadvpi",
+                str(cocotb_config.lib_name_path("vpi", "xcelium")) + ":vlog_startup_routines_bootstrap",
+                "-plinowarn",
+                "-access",
+                "+rwc",
+                "-top",
+                self.toplevel_module,
+            ]
+            + snapshot_args
+            + self.get_define_commands(self.defines)
+            + self.get_include_commands(self.includes)
+            + self.get_parameter_commands(self.parameters)
+            + self.compile_args + self.extra_args
+            + self.verilog_sources_flat
+            + self.vhdl_sources_flat
+        )
+        if self.timescale:
+            cmd_elab += ["-timescale", self.timescale]
 
-            cmd.append(cmd_elab)
+        if self.outdated(out_file, self.verilog_sources_flat + self.vhdl_sources_flat, [cmd_elab]) or self.force_compile:
+            cmd.append(Command(cmd_elab, phase="elaborate"))
 
         else:
             self.logger.warning(f"Skipping compilation:{out_file}")
@@ -747,11 +1846,12 @@ class Xcelium(Simulator):
         if not self.compile_only:
             cmd_run = (
                 ["xrun", "-64", "-R", ("-gui" if self.gui else "")]
+                + snapshot_args
                 + self.simulation_args
                 + self.get_parameter_commands(self.parameters)
                 + self.plus_args
             )
-            cmd.append(cmd_run)
+            cmd.append(Command(cmd_run, phase="run"))
 
         return cmd
 
@@ -808,7 +1908,11 @@ class Vcs(Simulator):
             cmd_build += [f"-timescale={self.timescale}"]
         else:
             cmd_build += [f"-timescale=1ns/1ps"]
-        cmd.append(cmd_build)
+
+        if self.outdated(simv_path, self.verilog_sources_flat, [cmd_build]) or self.force_compile:
+            cmd.append(cmd_build)
+        else:
+            self.logger.warning(f"Skipping compilation:{simv_path}")
 
         if not self.compile_only:
             cmd_run = [
@@ -822,7 +1926,7 @@ class Vcs(Simulator):
                 cmd_run += ["+fsdb+all=on", "-ucli", "-do", ucli_do]
             if self.gui:
                 cmd_run.append("-gui")
-            cmd.append(cmd_run)
+            cmd.append(Command(cmd_run, phase="run"))
 
         return cmd
 
@@ -842,12 +1946,19 @@ class Ghdl(Simulator):
         out_file = os.path.join(self.sim_dir, self.toplevel_module)
         compile_args = self.compile_args + self.extra_args + self.vhdl_compile_args
 
-        if self.outdated(out_file, self.vhdl_sources) or self.force_compile:
-            for lib, src in self.vhdl_sources.items():
-                cmd.append(["ghdl", "-i"] + compile_args + [f"--work={lib}"] + src)
+        cmd_compile = self.library_commands(
+            [(lib, ["ghdl", "-i"] + compile_args + [f"--work={lib}"] + src) for lib, src in self.vhdl_sources.items()]
+        )
+
+        cmd_elaborate = ["ghdl", "-m", f"--work={self.toplevel_library}"] + compile_args + [self.toplevel_module]
+        cmd_compile.append(Command(cmd_elaborate, phase="elaborate"))
+
+        # library files and elaborated toplevel, not other contents of a shared sim_build
+        artifacts = [os.path.join(glob.escape(self.sim_dir), glob.escape(lib) + "-obj*.cf") for lib in self.vhdl_sources]
+        artifacts.append(glob.escape(out_file))
 
-            cmd_elaborate = ["ghdl", "-m", f"--work={self.toplevel_library}"] + compile_args + [self.toplevel_module]
-            cmd.append(cmd_elaborate)
+        if self.outdated(out_file, self.vhdl_sources, cmd_compile, artifacts) or self.force_compile:
+            cmd += cmd_compile
 
         if self.waves:
             self.simulation_args.append(f"--wave={self.toplevel_module}.ghw")
@@ -864,7 +1975,7 @@ class Ghdl(Simulator):
         )
 
         if not self.compile_only:
-            cmd.append(cmd_run)
+            cmd.append(Command(cmd_run, phase="run"))
 
         return cmd
 
@@ -886,12 +1997,21 @@ class Nvc(Simulator):
 
         out_file = os.path.join(self.sim_dir, self.toplevel_module)
         compile_args = self.compile_args + self.vhdl_compile_args
-        if self.outdated(out_file, self.vhdl_sources) or self.force_compile:
-            for lib, src in self.vhdl_sources.items():
-                cmd.append(["nvc"] + self.extra_args + [f"--work={lib}", "-L", self.sim_dir, "-a"] + compile_args + src)
+        cmd_compile = self.library_commands(
+            [
+                (lib, ["nvc"] + self.extra_args + [f"--work={lib}", "-L", self.sim_dir, "-a"] + compile_args + src)
+                for lib, src in self.vhdl_sources.items()
+            ]
+        )
+
+        cmd_elaborate = ["nvc"] + self.extra_args + [f"--work={self.toplevel_library}", "-L", self.sim_dir, "-e"] + compile_args + self.get_parameter_commands(self.parameters) + [self.toplevel_module]
+        cmd_compile.append(Command(cmd_elaborate, phase="elaborate"))
 
-            cmd_elaborate = ["nvc"] + self.extra_args + [f"--work={self.toplevel_library}", "-L", self.sim_dir, "-e"] + compile_args + self.get_parameter_commands(self.parameters) + [self.toplevel_module]
-            cmd.append(cmd_elaborate)
+        # library directories hold the elaborated toplevel too
+        artifacts = [glob.escape(os.path.join(self.sim_dir, lib)) for lib in self.vhdl_sources]
+
+        if self.outdated(out_file, self.vhdl_sources, cmd_compile, artifacts) or self.force_compile:
+            cmd += cmd_compile
 
         if self.waves:
             self.simulation_args.append(f"--wave={self.toplevel_module}.fst")
@@ -909,7 +2029,7 @@ class Nvc(Simulator):
         )
 
         if not self.compile_only:
-            cmd.append(cmd_run)
+            cmd.append(Command(cmd_run, phase="run"))
 
         return cmd
 
@@ -932,29 +2052,35 @@ class Riviera(Simulator):
 
         out_file = os.path.join(self.sim_dir, self.rtl_library, self.rtl_library + ".lib")
 
-        if self.outdated(out_file, self.verilog_sources_flat + self.vhdl_sources_flat) or self.force_compile:
+        compile_script = f"alib {as_tcl_value(self.rtl_library)} \n"
 
-            do_script += f"alib {as_tcl_value(self.rtl_library)} \n"
+        if self.vhdl_sources:
+            compile_args = self.compile_args + self.extra_args + self.vhdl_compile_args
+            compile_script += "acom -work {RTL_LIBRARY} {EXTRA_ARGS} {VHDL_SOURCES}\n".format(
+                RTL_LIBRARY=as_tcl_value(self.rtl_library),
+                VHDL_SOURCES=" ".join(as_tcl_value(v) for v in self.vhdl_sources_flat),
+                EXTRA_ARGS=" ".join(as_tcl_value(v) for v in compile_args),
+            )
 
-            if self.vhdl_sources:
-                compile_args = self.compile_args + self.extra_args + self.vhdl_compile_args
-                do_script += "acom -work {RTL_LIBRARY} {EXTRA_ARGS} {VHDL_SOURCES}\n".format(
-                    RTL_LIBRARY=as_tcl_value(self.rtl_library),
-                    VHDL_SOURCES=" ".join(as_tcl_value(v) for v in self.vhdl_sources_flat),
-                    EXTRA_ARGS=" ".join(as_tcl_value(v) for v in compile_args),
-                )
+        if self.verilog_sources:
+            compile_args = self.compile_args + self.extra_args + self.verilog_compile_args
+            compile_script += "alog -work {RTL_LIBRARY} +define+COCOTB_SIM -sv {DEFINES} {INCDIR} {EXTRA_ARGS} {VERILOG_SOURCES} \n".format(
+                RTL_LIBRARY=as_tcl_value(self.rtl_library),
+                VERILOG_SOURCES=" ".join(as_tcl_value(v) for v in self.verilog_sources_flat),
+                DEFINES=" ".join(self.get_define_commands(self.defines)),
+                INCDIR=" ".join(self.get_include_commands(self.includes)),
+                EXTRA_ARGS=" ".join(as_tcl_value(v) for v in compile_args),
+            )
 
-            if self.verilog_sources:
-                compile_args = self.compile_args + self.extra_args + self.verilog_compile_args
-                do_script += "alog -work {RTL_LIBRARY} +define+COCOTB_SIM -sv {DEFINES} {INCDIR} {EXTRA_ARGS} {VERILOG_SOURCES} \n".format(
-                    RTL_LIBRARY=as_tcl_value(self.rtl_library),
-                    VERILOG_SOURCES=" ".join(as_tcl_value(v) for v in self.verilog_sources_flat),
-                    DEFINES=" ".join(self.get_define_commands(self.defines)),
-                    INCDIR=" ".join(self.get_include_commands(self.includes)),
-                    EXTRA_ARGS=" ".join(as_tcl_value(v) for v in compile_args),
-                )
+        if (
+            self.outdated(out_file, self.verilog_sources_flat + self.vhdl_sources_flat, [["vsimsa", compile_script]])
+            or self.force_compile
+        ):
+            do_script += compile_script
+            phase = "compile"
         else:
             self.logger.warning("Skipping compilation:" + out_file)
+            phase = "run"
 
         if not self.compile_only:
             if self.toplevel_lang == "vhdl":
@@ -992,7 +2118,7 @@ class Riviera(Simulator):
         do_file.close()
 
         command = "riviera" if self.gui else "vsimsa"
-        return [[command] + ["-do"] + ["do"] + [do_file.name]]
+        return [Command([command] + ["-do"] + ["do"] + [do_file.name], phase=phase)]
 
 
 class Activehdl(Simulator):
@@ -1010,27 +2136,31 @@ class Activehdl(Simulator):
 
         out_file = os.path.join(self.sim_dir, self.rtl_library, f"{self.rtl_library}.lib")
 
-        if self.outdated(out_file, self.verilog_sources_flat + self.vhdl_sources_flat) or self.force_compile:
+        compile_script = f"alib {as_tcl_value(self.rtl_library)} \n"
 
-            do_script += f"alib {as_tcl_value(self.rtl_library)} \n"
+        if self.vhdl_sources:
+            compile_args = self.compile_args + self.extra_args + self.vhdl_compile_args
+            compile_script += "acom -work {RTL_LIBRARY} {EXTRA_ARGS} {VHDL_SOURCES}\n".format(
+                RTL_LIBRARY=as_tcl_value(self.rtl_library),
+                VHDL_SOURCES=" ".join(as_tcl_value(v) for v in self.vhdl_sources_flat),
+                EXTRA_ARGS=" ".join(as_tcl_value(v) for v in compile_args),
+            )
 
-            if self.vhdl_sources:
-                compile_args = self.compile_args + self.extra_args + self.vhdl_compile_args
-                do_script += "acom -work {RTL_LIBRARY} {EXTRA_ARGS} {VHDL_SOURCES}\n".format(
-                    RTL_LIBRARY=as_tcl_value(self.rtl_library),
-                    VHDL_SOURCES=" ".join(as_tcl_value(v) for v in self.vhdl_sources_flat),
-                    EXTRA_ARGS=" ".join(as_tcl_value(v) for v in compile_args),
-                )
+        if self.verilog_sources:
+            compile_args = self.compile_args + self.extra_args + self.verilog_compile_args
+            compile_script += "alog {RTL_LIBRARY} +define+COCOTB_SIM -sv {DEFINES} {INCDIR} {EXTRA_ARGS} {VERILOG_SOURCES} \n".format(
+                RTL_LIBRARY=as_tcl_value(self.rtl_library),
+                VERILOG_SOURCES=" ".join(as_tcl_value(v) for v in self.verilog_sources_flat),
+                DEFINES=" ".join(self.get_define_commands(self.defines)),
+                INCDIR=" ".join(self.get_include_commands(self.includes)),
+                EXTRA_ARGS=" ".join(as_tcl_value(v) for v in compile_args),
+            )
 
-            if self.verilog_sources:
-                compile_args = self.compile_args + self.extra_args + self.verilog_compile_args
-                do_script += "alog {RTL_LIBRARY} +define+COCOTB_SIM -sv {DEFINES} {INCDIR} {EXTRA_ARGS} {VERILOG_SOURCES} \n".format(
-                    RTL_LIBRARY=as_tcl_value(self.rtl_library),
-                    VERILOG_SOURCES=" ".join(as_tcl_value(v) for v in self.verilog_sources_flat),
-                    DEFINES=" ".join(self.get_define_commands(self.defines)),
-                    INCDIR=" ".join(self.get_include_commands(self.includes)),
-                    EXTRA_ARGS=" ".join(as_tcl_value(v) for v in compile_args),
-                )
+        if (
+            self.outdated(out_file, self.verilog_sources_flat + self.vhdl_sources_flat, [["vsimsa", compile_script]])
+            or self.force_compile
+        ):
+            do_script += compile_script
         else:
             self.logger.warning(f"Skipping compilation:{out_file}")
 
@@ -1082,7 +2212,8 @@ class Activehdl(Simulator):
 
         do_script = "\nonerror {\n quit -code 1 \n} \n"
 
-        do_script += self.build_script_compile()
+        compile_script = self.build_script_compile()
+        do_script += compile_script
         if not self.compile_only:
             do_script += self.build_script_sim()
             do_script += self.build_script_run()
@@ -1091,11 +2222,13 @@ class Activehdl(Simulator):
         do_file.write(do_script.encode())
         do_file.close()
 
-        return [["vsimsa"] + ["-do"] + [do_file.name]]
+        # simulation only script does not need to hold the build lock
+        phase = "compile" if compile_script else "run"
+        return [Command(["vsimsa"] + ["-do"] + [do_file.name], phase=phase)]
 
 
 class Verilator(Simulator):
-    def __init__(self, make_args=None, *argv, **kwargs):
+    def __init__(self, make_args=None, *argv, objcache=None, objcache_dir=None, **kwargs):
         super().__init__(*argv, **kwargs)
 
         if make_args is None:
@@ -1103,6 +2236,10 @@ class Verilator(Simulator):
 
         self.make_args = make_args
 
+        # compiler cache command (e.g. "ccache") and its shared directory
+        self.objcache = objcache
+        self.objcache_dir = os.path.abspath(objcache_dir) if objcache_dir is not None else None
+
         if self.vhdl_sources:
             raise ValueError("This simulator does not support VHDL")
 
@@ -1115,6 +2252,18 @@ class Verilator(Simulator):
     def get_parameter_commands(self, parameters):
         return [f"-G{name}={str(value)}" for name, value in parameters.items()]
 
+    def make_build_args(self):
+        """Return make arguments that do not change the built model"""
+        args = []
+
+        if not any(arg.startswith(("-j", "--jobs")) for arg in self.make_args):
+            args.append(f"-j{os.cpu_count() or 1}")
+
+        if self.objcache is not None:
+            args.append(f"OBJCACHE={self.objcache}")
+
+        return args
+
     def build_command(self):
 
         cmd = []
@@ -1134,13 +2283,19 @@ class Verilator(Simulator):
 
         compile_args = self.compile_args + self.extra_args + self.verilog_compile_args
 
+        if self.objcache_dir is not None:
+            self.env["CCACHE_DIR"] = self.objcache_dir
+            # share objects between sim_build directories
+            self.env["CCACHE_BASEDIR"] = self.sim_dir
+            self.env["CCACHE_NOHASHDIR"] = "1"
+
         if self.waves:
             compile_args += ["--trace-fst", "--trace-structs"]
 
         if self.timescale:
             compile_args += ["--timescale", self.timescale]
 
-        cmd.append(
+        cmd_verilate = (
             [
                 "perl",
                 verilator_exec,
@@ -1168,17 +2323,22 @@ class Verilator(Simulator):
             + self.verilog_sources_flat
         )
 
-        cmd.append(["make", "-C", self.sim_dir, "-f", "Vtop.mk"] + self.make_args)
+        cmd_make = ["make", "-C", self.sim_dir, "-f", "Vtop.mk"] + self.make_args
+
+        # verilator script and cocotb main are inputs of the generated Vtop.mk
+        dependencies = self.verilog_sources_flat + [verilator_cpp, verilator_exec]
+        if self.outdated(out_file, dependencies, [cmd_verilate, cmd_make], [glob.escape(out_file)]) or self.force_compile:
+            cmd += [cmd_verilate, cmd_make + self.make_build_args()]
+        else:
+            self.logger.warning(f"Skipping compilation:{out_file}")
 
         if not self.compile_only:
-            cmd.append([out_file] + self.plus_args)
+            cmd.append(Command([out_file] + self.plus_args, phase="run"))
 
         return cmd
 
 
-def run(simulator=None, **kwargs):
-
-    __tracebackhide__ = True  # Hide the traceback when using PyTest.
+def get_simulator(simulator=None, **kwargs):
 
     sim_env = os.getenv("SIM")
 
@@ -1228,7 +2388,41 @@ def run(simulator=None, **kwargs):
     elif sim_env == "verilator":
         sim = Verilator(**kwargs)
 
-    return sim.run()
+    return sim
+
+
+def run(simulator=None, **kwargs):
+
+    __tracebackhide__ = True  # Hide the traceback when using PyTest.
+
+    return get_simulator(simulator, **kwargs).run()
+
+
+# event loop -> semaphore limiting concurrent simulations of arun()
+_arun_semaphores = weakref.WeakKeyDictionary()
+
+
+async def arun(simulator=None, semaphore=None, **kwargs):
+    """Coroutine variant of `run()`, returns results instead of raising on failures.
+
+    At most `semaphore` (default: one per CPU) simulations compile or run at the same time.
+    """
+    if semaphore is None:
+        loop = asyncio.get_running_loop()
+        if loop not in _arun_semaphores:
+            _arun_semaphores[loop] = asyncio.Semaphore(os.cpu_count() or 1)
+        semaphore = _arun_semaphores[loop]
+
+    async with semaphore:
+        return await get_simulator(simulator, **kwargs).arun()
+
+
+def run_batch(testcases, simulator=None, **kwargs):
+    """Run `testcases` in one simulator invocation and return status of each testcase"""
+
+    __tracebackhide__ = True  # Hide the traceback when using PyTest.
+
+    return get_simulator(simulator, **kwargs).run_batch(testcases)
 
 
 def clean(recursive=False):
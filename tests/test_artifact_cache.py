@@ -0,0 +1,103 @@
+from cocotb_test.simulator import run
+import pytest
+import os
+import shutil
+import tarfile
+import threading
+import http.server
+
+tests_dir = os.path.dirname(__file__)
+
+
+class ObjectStoreHandler(http.server.BaseHTTPRequestHandler):
+    """Stand-in for object store, keeps objects in memory"""
+
+    objects = {}
+
+    def do_GET(self):
+        data = self.objects.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_PUT(self):
+        self.objects[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(201)
+        self.end_headers()
+
+
+@pytest.fixture
+def object_store():
+    server = http.server.HTTPServer(("127.0.0.1", 0), ObjectStoreHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/artifacts"
+    server.shutdown()
+    thread.join()
+
+
+def run_agents(artifact_cache):
+    """Run same build in two fresh build directories, return phases of executed commands"""
+    phases = []
+    for agent in ("agent_a", "agent_b"):
+        sim_build = os.path.join("sim_build", "test_artifact_cache", agent)
+        shutil.rmtree(sim_build, ignore_errors=True)
+        results = run(
+            verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+            toplevel="dff_test",
+            module="dff_cocotb",
+            sim_build=sim_build,
+            artifact_cache=artifact_cache,
+        )
+        phases.append([record["phase"] for record in results.profile])
+    return phases
+
+
+@pytest.mark.skipif(os.getenv("SIM") != "icarus", reason="Checks Icarus artifacts")
+def test_artifact_cache_dir():
+    cache_dir = os.path.join("sim_build", "test_artifact_cache", "cache")
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+    assert run_agents(cache_dir) == [["compile", "run"], ["run"]]
+
+
+@pytest.mark.skipif(os.getenv("SIM") != "icarus", reason="Checks Icarus artifacts")
+def test_artifact_cache_http(object_store):
+    ObjectStoreHandler.objects.clear()
+
+    assert run_agents(object_store) == [["compile", "run"], ["run"]]
+
+
+@pytest.mark.skipif(os.getenv("SIM") not in ("ghdl", "nvc"), reason="Checks GHDL and NVC artifacts")
+def test_artifact_cache_vhdl():
+    sim_build = os.path.join("sim_build", "test_artifact_cache", "vhdl")
+    cache_dir = os.path.join("sim_build", "test_artifact_cache", "vhdl_cache")
+    for path in (sim_build, cache_dir):
+        shutil.rmtree(path, ignore_errors=True)
+
+    # outputs of other builds and runs sharing sim_build
+    os.makedirs(os.path.join(sim_build, "test_other"))
+    for name in ("dff_test_vhdl.ghw", os.path.join("test_other", "other.vvp")):
+        with open(os.path.join(sim_build, name), "w") as f:
+            f.write("not an artifact")
+
+    run(
+        vhdl_sources=[os.path.join(tests_dir, "dff.vhdl")],
+        toplevel="dff_test_vhdl",
+        module="dff_cocotb",
+        toplevel_lang="vhdl",
+        sim_build=sim_build,
+        artifact_cache=cache_dir,
+    )
+
+    archives = [os.path.join(root, name) for root, _, names in os.walk(cache_dir) for name in names]
+    assert len(archives) == 1
+    with tarfile.open(archives[0]) as tar:
+        names = tar.getnames()
+
+    assert names
+    assert all(name.startswith("dff_test_vhdl") and not name.endswith(".ghw") for name in names)
@@ -0,0 +1,45 @@
+from cocotb_test.simulator import run_batch
+import pytest
+import os
+
+import cocotb
+from cocotb.triggers import Timer
+
+tests_dir = os.path.dirname(__file__)
+
+@cocotb.test()
+async def batch_pass(dut):
+    await Timer(1)
+
+
+@cocotb.test()
+async def batch_fail(dut):
+    await Timer(1)
+    assert False
+
+
+@cocotb.test()
+async def batch_not_selected(dut):
+    await Timer(1)
+
+
+# All testcases of the module are simulated in a single simulator invocation
+@pytest.fixture(scope="module")
+def batch_results():
+    return run_batch(
+        testcases=["batch_pass", "batch_fail", "batch_missing"],
+        verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+        toplevel="dff_test",
+        module="test_batch",
+        sim_build="sim_build/test_batch",
+    )
+
+
+@pytest.mark.skipif(os.getenv("SIM") in ("ghdl", "nvc"), reason="Verilog not suported")
+@pytest.mark.parametrize(
+    "testcase,status",
+    [("batch_pass", "passed"), ("batch_fail", "failed"), ("batch_missing", "missing")],
+)
+def test_batch(batch_results, testcase, status):
+    assert batch_results[testcase] == status
+    assert "batch_not_selected" not in batch_results
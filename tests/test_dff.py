@@ -1,6 +1,7 @@
-from cocotb_test.simulator import run
+from cocotb_test.simulator import Verilator, run
 import pytest
 import os
+import shutil
 
 tests_dir = os.path.dirname(__file__)
 
@@ -17,6 +18,53 @@ def test_dff_vhdl():
     run(vhdl_sources=[os.path.join(tests_dir, "dff.vhdl")], toplevel="dff_test_vhdl", module="dff_cocotb", toplevel_lang="vhdl")
 
 
+@pytest.mark.skipif(os.getenv("SIM") != "verilator", reason="Verilator only")
+def test_dff_verilator_make_jobs():
+    results = run(
+        verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+        toplevel="dff_test",
+        module="dff_cocotb",
+        sim_build="sim_build/test_verilator_make_jobs",
+        force_compile=True,
+    )
+
+    cmd_make = [record["command"] for record in results.profile if record["command"][0] == "make"][0]
+    assert f"-j{os.cpu_count() or 1}" in cmd_make
+
+    # explicit jobs are kept
+    sim = Verilator(
+        verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+        toplevel="dff_test",
+        module="dff_cocotb",
+        make_args=["-j2"],
+    )
+    assert not any(arg.startswith("-j") for arg in sim.make_build_args())
+
+
+@pytest.mark.skipif(os.getenv("SIM") != "verilator", reason="Verilator only")
+@pytest.mark.skipif(shutil.which("ccache") is None, reason="ccache not installed")
+def test_dff_verilator_objcache():
+    objcache_dir = os.path.abspath("sim_build/test_verilator_objcache/ccache")
+    shutil.rmtree(objcache_dir, ignore_errors=True)
+
+    for build in ("a", "b"):
+        results = run(
+            verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+            toplevel="dff_test",
+            module="dff_cocotb",
+            sim_build="sim_build/test_verilator_objcache/" + build,
+            objcache="ccache",
+            objcache_dir=objcache_dir,
+            force_compile=True,
+        )
+
+        cmd_make = [record["command"] for record in results.profile if record["command"][0] == "make"][0]
+        assert "OBJCACHE=ccache" in cmd_make
+
+    # objects of the first build are shared with the second one
+    assert os.listdir(objcache_dir)
+
+
 if __name__ == "__main__":
     test_dff_verilog()
     # test_dff_vhdl()
@@ -0,0 +1,71 @@
+from cocotb_test.simulator import FileCache, inotify_libc
+import pytest
+import os
+
+# digests are trusted for the whole test unless a change is reported
+TTL = 3600
+
+
+def digest(cache, path):
+    return cache.digest(str(path)).hex()
+
+
+@pytest.mark.skipif(inotify_libc() is None, reason="inotify not available")
+def test_file_cache_modify(tmp_path):
+    cache = FileCache(ttl=TTL)
+    source = tmp_path / "x.v"
+    source.write_text("module x; endmodule\n")
+    stat = os.stat(source)
+
+    before = digest(cache, source)
+
+    # same size and mtime, only the change event tells
+    source.write_text("module y; endmodule\n")
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert digest(cache, source) != before
+
+
+@pytest.mark.skipif(inotify_libc() is None, reason="inotify not available")
+def test_file_cache_replace(tmp_path):
+    cache = FileCache(ttl=TTL)
+    source = tmp_path / "x.v"
+    source.write_text("module x; endmodule\n")
+
+    before = digest(cache, source)
+
+    (tmp_path / "x.v.tmp").write_text("module y; endmodule\n")
+    os.replace(tmp_path / "x.v.tmp", source)
+
+    assert digest(cache, source) != before
+
+
+@pytest.mark.skipif(inotify_libc() is None, reason="inotify not available")
+def test_file_cache_symlink(tmp_path):
+    cache = FileCache(ttl=TTL)
+    (tmp_path / "real").mkdir()
+    (tmp_path / "real" / "x.v").write_text("module x; endmodule\n")
+    (tmp_path / "real" / "y.v").write_text("module y; endmodule\n")
+    link = tmp_path / "link.v"
+    link.symlink_to(tmp_path / "real" / "x.v")
+
+    assert digest(cache, link) == digest(cache, tmp_path / "real" / "x.v")
+
+    link.unlink()
+    link.symlink_to(tmp_path / "real" / "y.v")
+
+    assert digest(cache, link) == digest(cache, tmp_path / "real" / "y.v")
+
+
+def test_file_cache_ttl(tmp_path, monkeypatch):
+    cache = FileCache(ttl=0)
+    source = tmp_path / "x.v"
+    source.write_text("module x; endmodule\n")
+
+    before = digest(cache, source)
+
+    # change made on another host of a network file system, no event
+    monkeypatch.setattr(cache, "read_events", lambda: None)
+    source.write_text("module xy; endmodule\n")
+
+    assert digest(cache, source) != before
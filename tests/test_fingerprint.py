@@ -0,0 +1,62 @@
+from cocotb_test.simulator import run
+import pytest
+import os
+import shutil
+
+tests_dir = os.path.dirname(__file__)
+
+
+def read_fingerprint(sim_build, toplevel="dff_test"):
+    with open(os.path.join(sim_build, toplevel + ".vvp.fingerprint")) as f:
+        return f.read()
+
+
+@pytest.mark.skipif(os.getenv("SIM") != "icarus", reason="Checks Icarus output files")
+def test_fingerprint_rebuild():
+    sim_build = os.path.join("sim_build", "test_fingerprint")
+    kwargs = dict(
+        verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+        toplevel="dff_test",
+        module="dff_cocotb",
+        sim_build=sim_build,
+    )
+
+    run(**kwargs)
+    fingerprint = read_fingerprint(sim_build)
+
+    # only touching sources does not change the fingerprint
+    os.utime(os.path.join(tests_dir, "dff.sv"))
+    run(**kwargs)
+    assert read_fingerprint(sim_build) == fingerprint
+
+    run(defines=["FINGERPRINT=1"], **kwargs)
+    assert read_fingerprint(sim_build) != fingerprint
+
+
+@pytest.mark.skipif(os.getenv("SIM") != "icarus", reason="Checks Icarus output files")
+def test_fingerprint_include(tmp_path):
+    shutil.copy(os.path.join(tests_dir, "test_parameters.v"), tmp_path)
+    shutil.copytree(os.path.join(tests_dir, "includes"), tmp_path / "includes")
+
+    sim_build = os.path.join("sim_build", "test_fingerprint_include")
+    kwargs = dict(
+        verilog_sources=[str(tmp_path / "test_parameters.v")],
+        toplevel="test_parameters",
+        module="test_parameters",
+        includes=[str(tmp_path / "includes")],
+        defines=["DEFINE=1"],
+        sim_build=sim_build,
+    )
+
+    run(**kwargs)
+    fingerprint = read_fingerprint(sim_build, "test_parameters")
+
+    # files in include directories that are not included do not matter
+    (tmp_path / "includes" / "unused.sv").write_text("// unused\n")
+    run(**kwargs)
+    assert read_fingerprint(sim_build, "test_parameters") == fingerprint
+
+    with open(tmp_path / "includes" / "inc.sv", "a") as f:
+        f.write("// changed\n")
+    run(**kwargs)
+    assert read_fingerprint(sim_build, "test_parameters") != fingerprint
@@ -2,7 +2,7 @@ import cocotb
 from cocotb.triggers import Timer
 
 import pytest
-from cocotb_test.simulator import run
+from cocotb_test.simulator import get_simulator, run
 import os
 
 hdl_dir = os.path.dirname(__file__)
@@ -21,3 +21,27 @@ async def run_test_long_log(dut):
 @pytest.mark.skipif(os.getenv("SIM") in ("ghdl", "nvc"), reason="VHDL not suported")
 def test_long_log():
     run(verilog_sources=[os.path.join(hdl_dir, "dff.sv")], module="test_long_log", toplevel="dff_test")
+
+
+@pytest.mark.skipif(os.getenv("SIM") in ("ghdl", "nvc"), reason="VHDL not suported")
+def test_long_log_file():
+    log_file = os.path.join("sim_build", "test_long_log_file.log")
+    run(verilog_sources=[os.path.join(hdl_dir, "dff.sv")], module="test_long_log", toplevel="dff_test", log_file=log_file)
+
+    with open(log_file) as f:
+        log = f.read()
+
+    assert "BEFORE" in log
+    assert "LONGLOG" * 100000 in log
+    assert "AFTER" in log
+
+
+@pytest.mark.skipif(os.getenv("SIM") in ("ghdl", "nvc"), reason="VHDL not suported")
+def test_long_log_file_rerun():
+    log_file = os.path.join("sim_build", "test_long_log_file_rerun.log")
+    sim = get_simulator(verilog_sources=[os.path.join(hdl_dir, "dff.sv")], module="test_long_log", toplevel="dff_test", log_file=log_file)
+
+    # log file is rewritten by every run, so are its statistics
+    for _ in range(2):
+        sim.run()
+        assert sim.log_bytes == os.path.getsize(log_file)
@@ -1,6 +1,7 @@
 from cocotb_test.simulator import run
 import pytest
 import os
+import shutil
 
 tests_dir = os.path.dirname(__file__)
 
@@ -17,5 +18,43 @@ def test_dff_vhdl():
     )
 
 
+@pytest.mark.skipif(os.getenv("SIM") not in ("questa", "ghdl", "nvc"), reason="Named libraries only supported for Questa, GHDL, and NVC.")
+def test_dff_vhdl_library_dependencies():
+    run(
+        vhdl_sources = {
+            "some_other_lib": [os.path.join(tests_dir, "dff_wrapper.vhdl")],
+            "some_lib": [os.path.join(tests_dir, "dff.vhdl")],
+        },
+        library_dependencies={"some_other_lib": ["some_lib"]},
+        toplevel="some_other_lib.dff_wrapper",
+        module="dff_cocotb",
+        toplevel_lang="vhdl",
+        sim_build="sim_build/test_library_dependencies",
+    )
+
+
+@pytest.mark.skipif(os.getenv("SIM") not in ("questa", "modelsim"), reason="vopt only for Questa")
+def test_dff_vhdl_vopt():
+    shutil.rmtree("sim_build/test_named_lib_vopt", ignore_errors=True)
+
+    phases = []
+    for _ in range(2):
+        results = run(
+            vhdl_sources = {
+                "some_lib": [os.path.join(tests_dir, "dff.vhdl")],
+                "some_other_lib": [os.path.join(tests_dir, "dff_wrapper.vhdl")],
+            },
+            toplevel="some_other_lib.dff_wrapper",
+            module="dff_cocotb",
+            toplevel_lang="vhdl",
+            sim_build="sim_build/test_named_lib_vopt",
+            vopt=True,
+        )
+        phases.append(sorted({record["phase"] for record in results.profile}))
+
+    # same configuration reuses compiled and optimized units
+    assert phases == [["compile", "elaborate", "run"], ["run"]]
+
+
 if __name__ == "__main__":
     test_dff_vhdl()
@@ -1,15 +1,16 @@
-from cocotb_test.simulator import run
+from cocotb_test.simulator import arun, run
+import asyncio
 import pytest
 import os
 
 tests_dir = os.path.dirname(__file__)
 
-# For parallel runs
-# Pre-compile:
+# For parallel runs the compilation in a shared `sim_build` is guarded by a lock,
+# first worker compiles and the others reuse the result:
+# pytest -n 2 test_parallel.py
+# Pre-compiling is still possible:
 # pytest -m compile test_parallel.py
-# Run:
 # pytest -m 'not compile' -n 2 test_parallel.py
-# There are possibly better ways to do this
 
 @pytest.mark.skipif(os.getenv("SIM") in ("ghdl", "nvc"), reason="Verilog not suported")
 @pytest.mark.compile
@@ -44,6 +45,33 @@ def test_dff_verilog_testcase(seed):
     )
 
 
+@pytest.mark.skipif(os.getenv("SIM") in ("ghdl", "nvc"), reason="Verilog not suported")
+def test_dff_verilog_arun():
+    async def run_seeds():
+        semaphore = asyncio.Semaphore(4)
+        return await asyncio.gather(
+            *[
+                arun(
+                    verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+                    toplevel="dff_test",
+                    module="dff_cocotb",
+                    seed=seed,
+                    sim_build="sim_build/test_arun",
+                    semaphore=semaphore,
+                )
+                for seed in range(8)
+            ]
+        )
+
+    all_results = asyncio.run(run_seeds())
+    assert len(set(all_results)) == len(all_results)  # every run has own results file
+
+    for results in all_results:
+        assert results.error is None
+        assert results.failed == 0
+        assert results.testcases
+
+
 # For GHDL create new build/direcotry for every run
 @pytest.mark.skipif(os.getenv("SIM") == "verilator", reason="VHDL not suported")
 @pytest.mark.skipif(os.getenv("SIM") == "icarus", reason="VHDL not suported")
@@ -1,6 +1,7 @@
 from cocotb_test.simulator import run
 import pytest
 import os
+import shutil
 
 import cocotb
 from cocotb.triggers import Timer
@@ -38,6 +39,76 @@ def test_dff_verilog_testcase(parameters):
     )
 
 
+@pytest.mark.skipif(os.getenv("SIM") in ("ghdl", "nvc"), reason="Verilog not suported")
+def test_dff_verilog_config_build():
+    shutil.rmtree("sim_build/test_config_build", ignore_errors=True)
+
+    phases = []
+    for parameters in ({"WIDTH_IN": "8", "WIDTH_OUT": "16"}, {"WIDTH_IN": "16"}, {"WIDTH_IN": "16"}, {}):
+        results = run(
+            verilog_sources=[os.path.join(tests_dir, "test_parameters.v")],
+            toplevel="test_parameters",
+            module="test_parameters",
+            parameters=parameters,
+            includes=[os.path.join(tests_dir, "includes")],
+            defines=["DEFINE=1"],
+            extra_env=parameters,
+            sim_build="sim_build/test_config_build",
+            max_build_configs=2,
+        )
+        phases.append([record["phase"] for record in results.profile])
+
+    # least recently used configuration was removed
+    configs = [name for name in os.listdir("sim_build/test_config_build") if name.startswith("config_")]
+    assert len(configs) == 2
+
+    # repeated configuration reuses its build
+    assert phases[2] == ["run"]
+
+
+@pytest.mark.skipif(os.getenv("SIM") not in ("ius", "xcelium"), reason="Snapshots only for Ius and Xcelium")
+def test_dff_verilog_snapshot():
+    shutil.rmtree("sim_build/snapshots", ignore_errors=True)
+
+    phases = []
+    for seed in (1, 2, 3):
+        results = run(
+            verilog_sources=[os.path.join(tests_dir, "test_parameters.v")],
+            toplevel="test_parameters",
+            module="test_parameters",
+            parameters={"WIDTH_IN": "8", "WIDTH_OUT": "16"},
+            includes=[os.path.join(tests_dir, "includes")],
+            defines=["DEFINE=1"],
+            extra_env={"WIDTH_IN": "8", "WIDTH_OUT": "16"},
+            seed=seed,
+            sim_build="sim_build/test_snapshot_" + str(seed),
+            snapshot_dir="sim_build/snapshots",
+        )
+        phases.append([record["phase"] for record in results.profile])
+
+    # only the first run elaborates, the others use its snapshot
+    assert "elaborate" in phases[0]
+    assert all("elaborate" not in run_phases for run_phases in phases[1:])
+
+
+@pytest.mark.skipif(os.getenv("SIM") not in ("questa", "modelsim"), reason="vopt only for Questa")
+@pytest.mark.parametrize(
+    "parameters", [{"WIDTH_IN": "8", "WIDTH_OUT": "16"}, {"WIDTH_IN": "16"}]
+)
+def test_dff_verilog_vopt(parameters):
+    run(
+        verilog_sources=[os.path.join(tests_dir, "test_parameters.v")],
+        toplevel="test_parameters",
+        module="test_parameters",
+        parameters=parameters,
+        includes=[os.path.join(tests_dir, "includes")],
+        defines=["DEFINE=1"],
+        extra_env=parameters,
+        sim_build="sim_build/test_vopt",
+        vopt=True,
+    )
+
+
 @pytest.mark.skipif(os.getenv("SIM") == "verilator", reason="VHDL not suported")
 @pytest.mark.skipif(os.getenv("SIM") == "icarus", reason="VHDL not suported")
 @pytest.mark.parametrize(
@@ -0,0 +1,83 @@
+from xml.etree import ElementTree as ET
+import json
+import os
+import pytest
+
+pytest_plugins = ["pytester"]
+
+
+def plugin_args(pytestconfig):
+    # plugin is loaded by its entry point once cocotb-test is installed
+    if pytestconfig.pluginmanager.get_plugin("pytest-cocotb") is None:
+        return ["-p", "cocotb_test.plugin"]
+    return []
+
+
+def passed_order(result):
+    return [line.split()[0] for line in result.outlines if " PASSED" in line]
+
+
+def test_schedule(pytester, pytestconfig):
+    pytester.makepyfile(
+        test_a="def test_a1():\n    pass\n\ndef test_a2():\n    pass\n",
+        test_b="def test_b1():\n    pass\n",
+    )
+    os.makedirs(os.path.join(str(pytester.path), ".cocotb-results"))
+    history_file = os.path.join(str(pytester.path), ".cocotb-results", "durations.json")
+    with open(history_file, "w") as f:
+        json.dump({"test_a.py::test_a1": 1, "test_a.py::test_a2": 10, "test_b.py::test_b1": 5}, f)
+
+    result = pytester.runpytest_subprocess(*plugin_args(pytestconfig), "--cocotb-schedule", "-v")
+    result.assert_outcomes(passed=3)
+
+    # longest module first, tests of a module stay together and in order
+    assert passed_order(result) == ["test_a.py::test_a1", "test_a.py::test_a2", "test_b.py::test_b1"]
+
+    with open(history_file) as f:
+        assert sorted(json.load(f)) == ["test_a.py::test_a1", "test_a.py::test_a2", "test_b.py::test_b1"]
+
+
+RESULTS_TEST = """
+import os
+import pytest
+
+@pytest.mark.parametrize("i", range(4))
+def test_sim(i):
+    with open(os.environ["COCOTB_RESULTS_FILE"], "w") as f:
+        f.write(
+            '<testsuites name="results"><testsuite name="all" package="%s">'
+            '<testcase name="tc%d" classname="mod" time="1" /></testsuite></testsuites>'
+            % (os.environ["RESULT_TESTPACKAGE"], i)
+        )
+"""
+
+KEPT_RESULTS_CONFTEST = """
+def pytest_terminal_summary(terminalreporter):
+    reports = [report for reports in terminalreporter.stats.values() for report in reports]
+    kept = [report for report in reports if hasattr(report, "cocotb_xml")]
+    terminalreporter.write_line("reports with cocotb results: %d" % len(kept))
+"""
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_cocotb_xml(pytester, pytestconfig, workers):
+    args = plugin_args(pytestconfig)
+    if workers is not None:
+        pytest.importorskip("xdist")
+        args += ["-n", str(workers)]
+
+    pytester.makepyfile(test_results=RESULTS_TEST)
+    pytester.makeconftest(KEPT_RESULTS_CONFTEST)
+
+    result = pytester.runpytest_subprocess(*args, "--cocotb-xml=merged.xml")
+    result.assert_outcomes(passed=4)
+
+    # reports are kept for the whole session, results are not
+    result.stdout.fnmatch_lines(["reports with cocotb results: 0"])
+
+    # results of every test, sent by workers with their reports
+    testsuites = ET.parse(os.path.join(str(pytester.path), "merged.xml")).getroot()
+    assert len(testsuites) == 4
+    testcases = [testcase for testsuite in testsuites for testcase in testsuite]
+    assert sorted(testcase.get("name") for testcase in testcases) == ["tc0", "tc1", "tc2", "tc3"]
+    assert all(testcase.get("classname") == "cocotb.mod" for testcase in testcases)
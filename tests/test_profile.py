@@ -0,0 +1,121 @@
+from cocotb_test.simulator import Command, Icarus, run
+import pytest
+import json
+import os
+import sys
+
+tests_dir = os.path.dirname(__file__)
+
+
+@pytest.mark.skipif(os.getenv("SIM") in ("ghdl", "nvc"), reason="Verilog not suported")
+def test_profile():
+    results = run(
+        verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+        toplevel="dff_test",
+        module="dff_cocotb",
+        sim_build="sim_build/test_profile",
+    )
+
+    assert results.profile[-1]["phase"] == "run"
+    assert results.profile[-1]["returncode"] == 0
+    assert all(record["wall_time"] >= 0 for record in results.profile)
+
+    with open(os.path.splitext(results)[0] + "_profile.json") as f:
+        assert json.load(f) == results.profile
+
+
+@pytest.mark.skipif(os.getenv("SIM") in ("ghdl", "nvc"), reason="Verilog not suported")
+def test_wall_time_limit():
+    with pytest.raises(SystemExit, match="FAILED 1 tests"):
+        run(
+            verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+            toplevel="dff_test",
+            module="dff_cocotb",
+            sim_build="sim_build/test_wall_time_limit",
+            max_wall_time=0.001,
+        )
+
+
+class IcarusHang(Icarus):
+    """Stub flow with a Python `script` in `phase`, by default printing once and then hanging"""
+
+    def __init__(self, phase, *argv, script="import time; print('started', flush=True); time.sleep(60)", **kwargs):
+        self.phase = phase
+        self.script = script
+        super().__init__(*argv, **kwargs)
+
+    def build_command(self):
+        return [Command([sys.executable, "-c", self.script], phase=self.phase)]
+
+
+@pytest.mark.skipif(os.getenv("SIM") != "icarus", reason="Custom for Icarus")
+def test_compile_timeout():
+    with pytest.raises(SystemExit, match="exceeded compile timeout"):
+        IcarusHang(
+            phase="compile",
+            verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+            toplevel="dff_test",
+            module="dff_cocotb",
+            sim_build="sim_build/test_compile_timeout",
+            compile_only=True,
+            timeouts={"compile": 0.5},
+        ).run()
+
+
+@pytest.mark.skipif(os.getenv("SIM") != "icarus", reason="Custom for Icarus")
+def test_inactivity_timeout():
+    sim = IcarusHang(
+        phase="run",
+        verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+        toplevel="dff_test",
+        module="dff_cocotb",
+        sim_build="sim_build/test_inactivity_timeout",
+        inactivity_timeout=0.5,
+    )
+
+    with pytest.raises(SystemExit, match="FAILED 1 tests"):
+        sim.run()
+
+    assert "produced no output" in sim.limit_exceeded
+    assert sim.profile[-1]["wall_time"] < 30
+
+
+@pytest.mark.skipif(os.getenv("SIM") != "icarus", reason="Custom for Icarus")
+@pytest.mark.skipif(sys.platform == "win32", reason="CPU time limit not supported")
+def test_cpu_time_limit():
+    sim = IcarusHang(
+        phase="run",
+        script="while True: pass",
+        verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+        toplevel="dff_test",
+        module="dff_cocotb",
+        sim_build="sim_build/test_cpu_time_limit",
+        max_cpu_time=0.5,
+    )
+
+    with pytest.raises(SystemExit, match="FAILED 1 tests"):
+        sim.run()
+
+    # fraction of a second is rounded up, not down to no time at all
+    assert "exceeded CPU time limit" in sim.limit_exceeded
+    assert sim.profile[-1]["user_time"] + sim.profile[-1]["system_time"] >= 0.5
+
+
+@pytest.mark.skipif(os.getenv("SIM") != "icarus", reason="Custom for Icarus")
+@pytest.mark.skipif(sys.platform == "win32", reason="CPU time limit not supported")
+def test_cpu_time_limit_other_kill():
+    sim = IcarusHang(
+        phase="run",
+        script="import os, signal; os.kill(os.getpid(), signal.SIGKILL)",
+        verilog_sources=[os.path.join(tests_dir, "dff.sv")],
+        toplevel="dff_test",
+        module="dff_cocotb",
+        sim_build="sim_build/test_cpu_time_limit_other_kill",
+        max_cpu_time=60,
+    )
+
+    # e.g. OOM killer, not the CPU time limit
+    with pytest.raises(SystemExit, match="terminated with error"):
+        sim.run()
+
+    assert sim.limit_exceeded is None
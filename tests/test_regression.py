@@ -0,0 +1,42 @@
+from cocotb_test.regression import build_key, run_regression
+from xml.etree import cElementTree as ET
+import asyncio
+import pytest
+import os
+
+tests_dir = os.path.dirname(__file__)
+
+
+@pytest.mark.skipif(os.getenv("SIM") in ("ghdl", "nvc"), reason="Verilog not suported")
+def test_regression():
+    defaults = dict(verilog_sources=[os.path.join(tests_dir, "dff.sv")], toplevel="dff_test", module="dff_cocotb")
+    entries = [
+        dict(defaults, name="seed_1", seed=1),
+        dict(defaults, name="seed_2", seed=2),
+        dict(defaults, name="define", defines=["REGRESSION"]),
+        dict(defaults, name="missing", verilog_sources=[os.path.join(tests_dir, "missing.sv")]),
+    ]
+
+    results = asyncio.run(
+        run_regression(entries, jobs=2, junit_file="sim_build/regression.xml", sim_build="sim_build/test_regression")
+    )
+
+    for name in ("seed_1", "seed_2", "define"):
+        assert results[name].error is None
+        assert results[name].failed == 0
+        assert results[name].testcases
+        assert os.path.isfile(os.path.join(os.path.dirname(results[name]), name + ".log"))
+        # compiled by the shared build only
+        assert [record["phase"] for record in results[name].profile] == ["run"]
+
+    assert results["missing"].error is not None
+
+    # runs differing only in seed share a build
+    assert os.path.dirname(results["seed_1"]) == os.path.dirname(results["seed_2"])
+    assert os.path.dirname(results["seed_1"]) != os.path.dirname(results["define"])
+
+    testsuites = ET.parse("sim_build/regression.xml").getroot()
+    assert sorted(testsuite.get("name") for testsuite in testsuites) == sorted(results)
+
+    # the python test module does not change the design
+    assert build_key(dict(defaults, module="dff_cocotb")) == build_key(dict(defaults, module="other_cocotb"))